@@ -0,0 +1,125 @@
+"""Время и число SQL-запросов списков публикаций и комментариев в админке.
+
+Сравнивает прежние настройки PostAdmin и CommentAdmin с текущими.
+Запуск из корня репозитория (временная база SQLite):
+    python -m benchmarks.admin_changelist --comments 1000000
+"""
+import argparse
+import importlib
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.setup_django import setup
+
+URLS = ('/admin/blog/post/', '/admin/blog/comment/')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--comments', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    return parser.parse_args()
+
+
+def legacy_admins():
+    from django.contrib import admin
+
+    class LegacyPostAdmin(admin.ModelAdmin):
+        list_display = ('title', 'text', 'author', 'category', 'location',
+                        'is_published')
+        list_editable = ('author', 'category', 'location', 'is_published')
+        search_fields = ('title', 'text')
+        list_filter = ('author', 'category', 'is_published')
+        list_display_links = ('title',)
+        ordering = ('author__first_name',)
+
+    class LegacyCommentAdmin(admin.ModelAdmin):
+        list_display = ('id', 'text', 'author', 'post')
+        list_editable = ('text',)
+        search_fields = ('text',)
+        list_filter = ('author', 'text')
+        list_display_links = ('id',)
+        ordering = ('author__first_name',)
+
+    return LegacyPostAdmin, LegacyCommentAdmin
+
+
+def register(post_admin, comment_admin):
+    from django.conf import settings
+    from django.contrib import admin
+    from django.urls import clear_url_caches
+
+    from blog.models import Comment, Post
+
+    for model, model_admin in ((Post, post_admin), (Comment, comment_admin)):
+        admin.site.unregister(model)
+        admin.site.register(model, model_admin)
+    # Маршруты админки держат экземпляры ModelAdmin, созданные
+    # при регистрации.
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+def measure(client, url, repeat):
+    from django.db import connection
+
+    from benchmarks.load_test import QueryCounter
+
+    timings = []
+    for _ in range(repeat):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return (statistics.median(timings) * 1000, counter.count,
+            len(response.content) / 1024)
+
+
+def run(client, repeat):
+    for url in URLS:
+        ms, queries, size = measure(client, url, repeat)
+        print(f'{url:24} {ms:9.1f} мс  запросов: {queries:4}  '
+              f'ответ: {size:8.0f} КБ')
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup(Path(tmp_dir) / 'benchmark.sqlite3')
+
+        from django.contrib import admin
+        from django.contrib.auth import get_user_model
+        from django.db import connection
+        from django.test import Client
+
+        from benchmarks.data import generate
+        from blog.models import Comment, Post
+
+        generate(users=args.users, categories=10, posts=args.posts,
+                 comments=args.comments, locations=20, seed=0)
+        current = (type(admin.site._registry[Post]),
+                   type(admin.site._registry[Comment]))
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(get_user_model().objects.create_superuser(
+            'admin', 'admin@example.com', 'admin'))
+
+        print(f'== {args.posts} публикаций, {args.comments} комментариев, '
+              f'{args.users} пользователей ==')
+        print('-- Прежние настройки --')
+        register(*legacy_admins())
+        run(client, args.repeat)
+
+        print('-- Текущие настройки --')
+        register(*current)
+        run(client, args.repeat)
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""План и время чтения ветки комментариев с индексами и без них.
+
+Запуск из корня репозитория (по умолчанию миллион комментариев
+во временной базе SQLite):
+    python -m benchmarks.comment_index_plan --comments 1000000
+"""
+import argparse
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+from benchmarks.setup_django import setup
+
+REPEAT = 50
+PAGE_SIZE = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--comments', type=int, default=1_000_000)
+    parser.add_argument('--posts', type=int, default=1_000)
+    parser.add_argument('--users', type=int, default=1_000)
+    return parser.parse_args()
+
+
+def measure(label, queryset):
+    plan = queryset.explain()
+    seconds = timeit.timeit(lambda: list(queryset.all()), number=REPEAT)
+    print(f'{label}: {seconds / REPEAT * 1000:.2f} мс/запрос\n{plan}\n')
+
+
+def run(queries):
+    for label, queryset in queries:
+        measure(label, queryset)
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup(Path(tmp_dir) / 'benchmark.sqlite3')
+
+        from django.db import connection
+
+        from benchmarks.data import create_posts, create_users, insert_comments
+        from blog.models import Category, Comment
+
+        users = create_users(args.users)
+        category = Category.objects.create(
+            title='Бенчмарк', description='', slug='benchmark')
+        posts = create_posts(args.posts, users, [category])
+        insert_comments(
+            args.comments, [p.pk for p in posts], [u.pk for u in users])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        post_id = random.choice(posts).pk
+        author_id = random.choice(users).pk
+        queries = (
+            ('Ветка комментариев', Comment.objects.filter(
+                post_id=post_id).order_by('created_at', 'id')[:PAGE_SIZE]),
+            ('История пользователя', Comment.objects.filter(
+                author_id=author_id).order_by('-created_at')[:PAGE_SIZE]),
+        )
+
+        print(f'== С индексами ({args.comments} комментариев) ==')
+        run(queries)
+
+        with connection.schema_editor() as schema_editor:
+            for index in Comment._meta.indexes:
+                schema_editor.remove_index(Comment, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        print('== Без индексов (только индексы внешних ключей) ==')
+        run(queries)
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Быстрое наполнение базы синтетическими данными для бенчмарков.
+
+Запуск из корня репозитория (наполняет указанный файл SQLite):
+    python -m benchmarks.data --database bench.sqlite3 --posts 100000
+"""
+import argparse
+import io
+import random
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 10_000
+# Словарь для текстов публикаций, чтобы поиску было что находить.
+WORDS = (
+    'город', 'море', 'горы', 'поход', 'кофе', 'книга', 'музыка', 'кино',
+    'погода', 'дорога', 'поезд', 'рецепт', 'сад', 'котики', 'собаки',
+    'работа', 'отпуск', 'фотография', 'вечер', 'утро', 'снег', 'дождь',
+    'лес', 'река', 'друзья', 'праздник', 'спорт', 'велосипед', 'код',
+    'выставка',
+)
+# Частоты слов убывают как в естественном тексте (закон Ципфа).
+WORD_WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+WORDS_PER_POST = 12
+
+
+def create_users(count):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        [User(username=f'user{i}') for i in range(count)],
+        batch_size=BATCH_SIZE)
+    # SQLite не возвращает id из bulk_create, поэтому читаем заново.
+    return list(User.objects.order_by('-pk')[:count])
+
+
+def create_categories(count):
+    from blog.models import Category
+
+    Category.objects.bulk_create(
+        [
+            Category(
+                title=f'Категория {i}',
+                description=f'Описание категории {i}',
+                slug=f'category-{i}',
+            )
+            for i in range(count)
+        ],
+        batch_size=BATCH_SIZE)
+    return list(Category.objects.order_by('-pk')[:count])
+
+
+def create_locations(count):
+    from blog.models import Location
+
+    Location.objects.bulk_create(
+        [Location(name=f'Место {i}') for i in range(count)],
+        batch_size=BATCH_SIZE)
+    return list(Location.objects.order_by('-pk')[:count])
+
+
+def create_posts(count, users, categories, locations=(None,)):
+    from blog.models import Post
+
+    now = timezone.now()
+    for offset in range(0, count, BATCH_SIZE):
+        Post.objects.bulk_create([
+            Post(
+                title=f'Публикация {i}',
+                text=f'Текст публикации {i}: ' + ' '.join(
+                    random.choices(
+                        WORDS, WORD_WEIGHTS, k=WORDS_PER_POST)),
+                pub_date=now - timedelta(minutes=i),
+                author=random.choice(users),
+                category=random.choice(categories),
+                location=random.choice(locations),
+                is_visible=True,
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, count))
+        ])
+    return list(Post.objects.order_by('-pk')[:count])
+
+
+def insert_comments(count, post_ids, user_ids):
+    """Вставляет комментарии напрямую в таблицу.
+
+    bulk_create перезаписал бы created_at из-за auto_now_add,
+    а для проверки сортировки нужны разные даты.
+    """
+    from blog.models import Comment
+
+    opts = Comment._meta
+    columns = [
+        opts.get_field(name).column
+        for name in ('text', 'post', 'author', 'created_at')
+    ]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(opts.db_table),
+        ', '.join(connection.ops.quote_name(c) for c in columns),
+        ', '.join(['%s'] * len(columns)))
+    start = timezone.now() - timedelta(seconds=count)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, count, BATCH_SIZE):
+            cursor.executemany(sql, [
+                (
+                    f'Комментарий {i}',
+                    random.choice(post_ids),
+                    random.choice(user_ids),
+                    connection.ops.adapt_datetimefield_value(
+                        start + timedelta(seconds=i)),
+                )
+                for i in range(offset, min(offset + BATCH_SIZE, count))
+            ])
+
+
+def generate(users, categories, posts, comments, locations=0, seed=None):
+    """Создаёт связанный набор данных и пересчитывает производные поля."""
+    from django.conf import settings
+    from django.core.management import call_command
+
+    random.seed(seed)
+    user_objs = create_users(users)
+    category_objs = create_categories(categories)
+    location_objs = create_locations(locations) or [None]
+    post_objs = create_posts(posts, user_objs, category_objs, location_objs)
+    insert_comments(
+        comments, [p.pk for p in post_objs], [u.pk for u in user_objs])
+
+    call_command('recount_comments', stdout=io.StringIO())
+    call_command('rebuild_search_index', stdout=io.StringIO())
+    if settings.PUBLISHED_FEED_TABLE:
+        call_command('sync_published_feed', '--rebuild',
+                     stdout=io.StringIO())
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--locations', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--comments', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database', required=True,
+                        help='Файл SQLite; будет создан и мигрирован.')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    from benchmarks.setup_django import setup
+    setup(args.database)
+    generate(args.users, args.categories, args.posts, args.comments,
+             locations=args.locations, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""Задержка и число запросов к БД для основных страниц блога.
+
+Гоняет страницы через тестовый клиент Django и сохраняет p50/p99
+и среднее число SQL-запросов на запрос в JSON. Запуск из корня
+репозитория (данные генерируются во временной базе SQLite):
+    python -m benchmarks.load_test --requests 200 --output result.json
+
+Сравнение с сохранённым результатом; код выхода 1, если p50 какого-то
+сценария вырос больше чем на --max-regression процентов:
+    python -m benchmarks.load_test --baseline result.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from benchmarks import data
+from benchmarks.setup_django import setup
+
+HOST = 'localhost'
+SCENARIOS = (
+    'index', 'post_detail', 'category_posts', 'profile', 'add_comment')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    data.add_arguments(parser)
+    parser.add_argument('--database',
+                        help=('Готовая база SQLite из benchmarks.data; '
+                              'без него данные создаются заново.'))
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Количество замеряемых запросов на сценарий.')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=5,
+                        help='Сколько первых страниц ленты запрашивать.')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Запустить только указанные сценарии.')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Отключить кэш страниц и счётчиков.')
+    parser.add_argument('--output', help='Куда записать результат в JSON.')
+    parser.add_argument('--baseline', help='Результат для сравнения.')
+    parser.add_argument('--max-regression', type=float, default=20)
+    return parser.parse_args()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def count_pages(counts, max_pages):
+    from django.conf import settings
+
+    # Не дальше последней страницы ленты: за ней вьюха отвечает 404.
+    return {
+        key: max(1, min(max_pages, math.ceil(count / settings.PAGINATE_BY)))
+        for key, count in counts
+    }
+
+
+def build_scenarios(args):
+    from django.db.models import Count
+    from django.test import Client
+    from django.urls import reverse
+
+    from blog.models import Category, Post, User
+
+    post_ids = list(Post.published_objects.values_list('pk', flat=True))
+    slugs = list(Category.objects.filter(
+        is_published=True).values_list('slug', flat=True))
+    usernames = list(User.objects.values_list('username', flat=True))
+    if not post_ids:
+        sys.exit('В базе нет опубликованных публикаций.')
+    index_pages = count_pages([(None, len(post_ids))], args.pages)
+    category_pages = count_pages(
+        Post.published_objects.order_by().values_list(
+            'category__slug').annotate(Count('pk')), args.pages)
+    profile_pages = count_pages(
+        Post.objects.order_by().values_list(
+            'author__username').annotate(Count('pk')), args.pages)
+
+    anonymous = Client(HTTP_HOST=HOST)
+    author = Client(HTTP_HOST=HOST)
+    author.force_login(User.objects.order_by('pk').first())
+
+    def page(pages, key=None):
+        return {'page': random.randint(1, pages.get(key, 1))}
+
+    def category_posts():
+        slug = random.choice(slugs)
+        return anonymous.get(reverse(
+            'blog:category_posts', args=(slug,)), page(category_pages, slug))
+
+    def profile():
+        username = random.choice(usernames)
+        return anonymous.get(reverse(
+            'blog:profile', args=(username,)), page(profile_pages, username))
+
+    return {
+        'index': lambda: anonymous.get(
+            reverse('blog:index'), page(index_pages)),
+        'post_detail': lambda: anonymous.get(reverse(
+            'blog:post_detail', args=(random.choice(post_ids),))),
+        'category_posts': category_posts,
+        'profile': profile,
+        'add_comment': lambda: author.post(reverse(
+            'blog:add_comment', args=(random.choice(post_ids),)),
+            {'text': 'Комментарий из бенчмарка'}),
+    }
+
+
+def measure(request, count, warmup):
+    from django.db import connection
+
+    for _ in range(warmup):
+        request()
+    timings = []
+    queries = []
+    for _ in range(count):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = request()
+            timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            sys.exit(f'Ответ {response.status_code} на {response.request}')
+        queries.append(counter.count)
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'requests': count,
+        'p50_ms': round(percentiles[49], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries_per_request': round(statistics.fmean(queries), 2),
+        'max_queries': max(queries),
+    }
+
+
+@contextmanager
+def benchmark_settings(no_cache):
+    from django.core.cache import cache
+    from django.test import override_settings
+
+    overrides = {'DEBUG': False}
+    if no_cache:
+        overrides.update(PAGE_CACHE_TIMEOUT=0, COUNT_CACHE_TIMEOUT=0)
+    else:
+        # Бенчмарк работает в одном процессе, LocMemCache здесь достаточно.
+        overrides.update(PAGE_CACHE_TIMEOUT=60 * 5)
+    cache.clear()
+    with override_settings(**overrides):
+        yield
+
+
+def run(args):
+    import django
+    from django.db import connection
+
+    random.seed(args.seed)
+    scenarios = build_scenarios(args)
+    results = {}
+    with benchmark_settings(args.no_cache):
+        for name in args.scenario or SCENARIOS:
+            results[name] = measure(
+                scenarios[name], max(args.requests, 2), args.warmup)
+            print(format_row(name, results[name]))
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'args': {
+                key: value for key, value in vars(args).items()
+                if key not in ('output', 'baseline')
+            },
+        },
+        'results': results,
+    }
+
+
+def format_row(name, result):
+    return (f'{name:>15} {result["p50_ms"]:>9.2f} {result["p99_ms"]:>9.2f} '
+            f'{result["queries_per_request"]:>8.2f}')
+
+
+def compare(results, baseline, max_regression):
+    print(f'\n{"сценарий":>15} {"p50 было":>9} {"p50 стало":>9} '
+          f'{"изм. %":>7} {"SQL было":>8} {"SQL стало":>9}')
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        change = (result['p50_ms'] / old['p50_ms'] - 1) * 100
+        print(f'{name:>15} {old["p50_ms"]:>9.2f} {result["p50_ms"]:>9.2f} '
+              f'{change:>+7.1f} {old["queries_per_request"]:>8.2f} '
+              f'{result["queries_per_request"]:>9.2f}')
+        if (change > max_regression
+                or result['queries_per_request']
+                > old['queries_per_request']):
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.database:
+            setup(args.database)
+        else:
+            setup(Path(tmp_dir) / 'benchmark.sqlite3')
+            data.generate(args.users, args.categories, args.posts,
+                          args.comments, locations=args.locations,
+                          seed=args.seed)
+
+        print(f'{"сценарий":>15} {"p50, мс":>9} {"p99, мс":>9} '
+              f'{"SQL":>8}')
+        report = run(args)
+
+        from django.db import connection
+        connection.close()
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2),
+            encoding='utf-8')
+    if args.baseline:
+        baseline = json.loads(
+            Path(args.baseline).read_text(encoding='utf-8'))['results']
+        regressions = compare(
+            report['results'], baseline, args.max_regression)
+        if regressions:
+            sys.exit('Регрессия: ' + ', '.join(regressions))
+
+
+if __name__ == '__main__':
+    main()
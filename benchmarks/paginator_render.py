@@ -0,0 +1,41 @@
+"""Время рендеринга includes/paginator.html в зависимости от числа страниц.
+
+Запуск из корня репозитория:
+    python -m benchmarks.paginator_render
+"""
+import timeit
+
+from benchmarks.setup_django import setup
+
+POST_COUNTS = (100, 1_000, 10_000, 100_000)
+REPEAT = 20
+
+
+def main():
+    setup()
+
+    from django.conf import settings
+    from django.core.paginator import Paginator
+    from django.template.loader import get_template
+
+    from blog.paginators import FeedPaginator
+
+    template = get_template('includes/paginator.html')
+    print(f'{"постов":>10} {"класс":>14} {"мс/рендер":>10} {"байт":>10}')
+    for n_posts in POST_COUNTS:
+        for paginator_class in (Paginator, FeedPaginator):
+            paginator = paginator_class(range(n_posts), settings.PAGINATE_BY)
+            page = paginator.page(paginator.num_pages // 2)
+            if not hasattr(page, 'page_range'):
+                # Прежнее поведение шаблона: ссылка на каждую страницу.
+                page.page_range = paginator.page_range
+            context = {'page_obj': page}
+            size = len(template.render(context))
+            seconds = timeit.timeit(
+                lambda: template.render(context), number=REPEAT)
+            print(f'{n_posts:>10} {paginator_class.__name__:>14} '
+                  f'{seconds / REPEAT * 1000:>10.3f} {size:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Поиск по публикациям: FTS5, собственный индекс BM25 и icontains.
+
+Запуск из корня репозитория (временная база SQLite):
+    python -m benchmarks.search_benchmark --posts 100000
+"""
+import argparse
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from benchmarks.setup_django import setup
+
+REPEAT = 20
+QUERIES = ('город', 'котики', 'выставка', 'река велосипед', 'публикации 99')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    return parser.parse_args()
+
+
+def measure(backend, query, repeat):
+    from django.conf import settings
+    from django.core.paginator import Paginator
+
+    from blog.models import Post
+
+    def run():
+        # Как в представлении поиска: число результатов для пагинатора
+        # и первая страница.
+        paginator = Paginator(backend.search(
+            Post.published_objects.with_related(), query),
+            settings.PAGINATE_BY)
+        return paginator.count, list(paginator.page(1))
+
+    count, _ = run()
+    seconds = timeit.timeit(run, number=repeat)
+    return count, seconds / repeat * 1000
+
+
+def measure_index(index, query, repeat):
+    from django.conf import settings
+
+    from blog.search_index import tokenize
+
+    terms = tokenize(query)
+    seconds = timeit.timeit(
+        lambda: index.search(terms, settings.PAGINATE_BY), number=repeat)
+    return seconds / repeat * 1000
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup(Path(tmp_dir) / 'benchmark.sqlite3')
+
+        from django.conf import settings
+        from django.db import connection
+
+        from benchmarks.data import generate
+        from blog.search import IcontainsBackend, SQLiteBackend
+        from blog.search_index import InvertedIndexBackend
+
+        generate(users=100, categories=10, posts=args.posts, comments=0,
+                 seed=0)
+        settings.SEARCH_INDEX_PATH = Path(tmp_dir) / 'posts.idx'
+        inverted = InvertedIndexBackend()
+        start = time.perf_counter()
+        inverted.rebuild()
+        print(f'Построение индекса BM25: {time.perf_counter() - start:.1f} с, '
+              f'{settings.SEARCH_INDEX_PATH.stat().st_size / 2 ** 20:.1f} МБ')
+        backends = (
+            ('FTS5', SQLiteBackend()),
+            ('BM25', inverted),
+            ('icontains', IcontainsBackend()),
+        )
+
+        print(f'== {args.posts} публикаций, мс на запрос '
+              '(COUNT + первая страница) ==')
+        for query in QUERIES:
+            for label, backend in backends:
+                count, ms = measure(backend, query, args.repeat)
+                print(f'{query!r:26} {label:10} {ms:9.2f} мс  '
+                      f'найдено: {count}')
+
+        print(f'\n== Только индекс BM25, первые {settings.PAGINATE_BY} ==')
+        index = inverted.get_index()
+        for query in QUERIES:
+            ms = measure_index(index, query, args.repeat)
+            print(f'{query!r:26} {ms:9.2f} мс')
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def setup(database_name=None):
+    """Настраивает Django; database_name подменяет файл базы SQLite."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+    from django.conf import settings
+    if database_name is not None:
+        settings.DATABASES['default']['NAME'] = str(database_name)
+
+    import django
+    django.setup()
+
+    if database_name is not None:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
@@ -1,9 +1,66 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.admin.options import get_content_type_for_model
 
-from blog.models import Category, Comment, Location, Post
+from blog import moderation
+from blog.models import Category, Comment, Job, Location, Post
+from blog.paginators import EstimatedCountPaginator
 
 
-class CategoryAdmin(admin.ModelAdmin):
+class BulkDeleteMixin:
+    """Удаление выбранных записей одним запросом на пачку."""
+
+    delete_objects = None
+
+    def log_deletion(self, request, obj, object_repr):
+        # Записи журнала копятся и сохраняются одним запросом.
+        request.__dict__.setdefault('_deletion_log', []).append(LogEntry(
+            user_id=request.user.pk,
+            content_type_id=get_content_type_for_model(obj).pk,
+            object_id=str(obj.pk),
+            object_repr=object_repr[:200],
+            action_flag=DELETION,
+        ))
+
+    def save_deletion_log(self, request):
+        LogEntry.objects.bulk_create(request.__dict__.pop('_deletion_log', []))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.save_deletion_log(request)
+
+    def delete_queryset(self, request, queryset):
+        # Стандартное действие удаления сохраняет страницу подтверждения,
+        # но удаляет без обхода каждого объекта.
+        self.delete_objects(queryset)
+        self.save_deletion_log(request)
+
+
+class ModerationMixin(BulkDeleteMixin):
+    """Массовая публикация и снятие с публикации."""
+
+    actions = ('publish', 'unpublish')
+    set_published = None
+
+    @admin.action(description='Опубликовать выбранные')
+    def publish(self, request, queryset):
+        updated = self.set_published(queryset, True)
+        self.message_user(request, f'Опубликовано: {updated}')
+
+    @admin.action(description='Снять с публикации выбранные')
+    def unpublish(self, request, queryset):
+        updated = self.set_published(queryset, False)
+        self.message_user(request, f'Снято с публикации: {updated}')
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(), required=False, label='Категория')
+
+
+class CategoryAdmin(ModerationMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'description',
@@ -23,9 +80,11 @@ class CategoryAdmin(admin.ModelAdmin):
     list_filter = ('title',)
     list_display_links = ('title',)
     ordering = ('slug',)
+    set_published = staticmethod(moderation.set_categories_published)
+    delete_objects = staticmethod(moderation.delete_categories)
 
 
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(ModerationMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'name',
@@ -41,59 +100,124 @@ class LocationAdmin(admin.ModelAdmin):
     )
     list_display_links = ('id',)
     ordering = ('id',)
+    set_published = staticmethod(moderation.set_locations_published)
+    delete_objects = staticmethod(moderation.delete_locations)
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ModerationMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'text',
+        'pub_date',
         'author',
         'category',
         'location',
         'is_published',
     )
-    list_editable = (
+    list_editable = ('is_published',)
+    list_select_related = (
         'author',
         'category',
         'location',
-        'is_published'
+    )
+    raw_id_fields = ('author',)
+    autocomplete_fields = (
+        'category',
+        'location',
     )
     search_fields = (
         'title',
-        'text',
+        '=author__username',
     )
     list_filter = (
-        'author',
         'category',
         'is_published'
     )
     list_display_links = ('title',)
-    ordering = ('author__first_name',)
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('publish', 'unpublish', 'change_category')
+    action_form = PostActionForm
+    set_published = staticmethod(moderation.set_posts_published)
+    delete_objects = staticmethod(moderation.delete_posts)
+
+    @admin.action(description='Перенести выбранные в категорию')
+    def change_category(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid() or form.cleaned_data['category'] is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса.', messages.ERROR)
+            return
+        category = form.cleaned_data['category']
+        updated = moderation.set_posts_category(queryset, category)
+        self.message_user(
+            request, f'Перенесено в «{category}»: {updated}')
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(BulkDeleteMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'text',
         'author',
         'post',
+        'created_at',
     )
     list_editable = (
         'text',
     )
-    search_fields = (
+    list_select_related = (
         'author',
-        'text',
+        'post',
     )
-    list_filter = (
+    raw_id_fields = (
         'author',
+        'post',
+    )
+    search_fields = (
+        '=author__username',
         'text',
     )
+    list_filter = ('created_at',)
     list_display_links = ('id',)
-    ordering = ('author__first_name',)
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    delete_objects = staticmethod(moderation.delete_comments)
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'kind',
+        'status',
+        'progress_display',
+        'attempts',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = ('status',)
+    list_display_links = ('id',)
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description='Ход выполнения')
+    def progress_display(self, job):
+        if not job.total:
+            return '—'
+        return f'{job.progress} из {job.total}'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,196 @@
+import json
+import re
+import time
+from collections import Counter, defaultdict
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 5000
+
+# Порядок вставки: родительские таблицы раньше зависимых.
+BULK_MODELS = (User, Category, Location, Post, Comment)
+
+# Между объектами верхнего уровня допустимы только пробелы, запятые
+# и скобки массива: так одним разбором читаются и dumpdata, и JSON Lines.
+SEPARATORS = re.compile(r'[\s,\[\]]*')
+
+
+def iter_json_objects(stream, chunk_size=CHUNK_SIZE):
+    """Читает объекты из JSON-массива или JSON Lines по одному."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    while True:
+        pos = SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer):
+            try:
+                obj, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # Объект мог не поместиться в прочитанный фрагмент.
+                if eof:
+                    raise DeserializationError(str(e)) from e
+            else:
+                if not isinstance(obj, dict):
+                    raise DeserializationError(
+                        f'Ожидался объект фикстуры, получено: {obj!r}')
+                yield obj
+                continue
+        elif eof:
+            break
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+
+class BulkLoader:
+    """Загружает фикстуру пачками, по транзакции на пачку.
+
+    Модели блога и пользователи вставляются через INSERT на много строк,
+    остальные модели сохраняются по одной, как в loaddata. В PostgreSQL
+    проверку внешних ключей нельзя отключить, поэтому родительские
+    объекты должны идти в файле раньше зависимых. Сигналы
+    моделей при этом не отправляются: счётчики комментариев и таблицу
+    ленты нужно пересчитать после загрузки.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE,
+                 ignorenonexistent=False, on_flush=None):
+        self.using = using
+        self.batch_size = batch_size
+        self.ignorenonexistent = ignorenonexistent
+        self.on_flush = on_flush
+        self.pending = defaultdict(list)
+        self.pending_m2m = defaultdict(list)
+        self.pending_count = 0
+        self.counts = Counter()
+        self.loaded_models = set()
+        self.started = time.monotonic()
+        self.now = timezone.now()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def load(self, objects):
+        connection = connections[self.using]
+        # Как в loaddata: ссылки вперёд (публикации раньше их авторов
+        # в db.json) проверяются один раз в конце, а не в каждой пачке.
+        with connection.constraint_checks_disabled():
+            for deserialized in Deserializer(
+                    objects, using=self.using,
+                    ignorenonexistent=self.ignorenonexistent):
+                self.add(deserialized)
+            self.flush()
+        connection.check_constraints(table_names=[
+            model._meta.db_table for model in self.loaded_models])
+        self.reset_sequences()
+        return self.counts
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        self.pending[type(obj)].append(deserialized)
+        for field_name, values in (deserialized.m2m_data or {}).items():
+            self._add_m2m(obj, field_name, values)
+        self.pending_count += 1
+        if self.pending_count >= self.batch_size:
+            self.flush()
+
+    def _add_m2m(self, obj, field_name, values):
+        if not values:
+            return
+        if obj.pk is None:
+            raise DeserializationError(
+                f'Для связей {field_name} у {obj._meta.label} нужен pk.')
+        field = obj._meta.get_field(field_name)
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(
+            field.m2m_reverse_field_name()).attname
+        self.pending_m2m[through].extend(
+            through(**{source: obj.pk, target: value}) for value in values)
+
+    def _flush_order(self):
+        others = [model for model in self.pending if model not in BULK_MODELS]
+        return [
+            *(model for model in BULK_MODELS if model in self.pending),
+            *serializers.sort_dependencies([(None, others)]),
+        ]
+
+    def flush(self):
+        if not self.pending_count:
+            return
+        with transaction.atomic(using=self.using):
+            for model in self._flush_order():
+                batch = self.pending.pop(model)
+                if model in BULK_MODELS:
+                    self._insert(model, [item.object for item in batch])
+                else:
+                    for item in batch:
+                        item.save(using=self.using)
+                self.counts[model._meta.label] += len(batch)
+                self.loaded_models.add(model)
+            for through, rows in self.pending_m2m.items():
+                through.objects.using(self.using).bulk_create(
+                    rows, batch_size=self.batch_size)
+        self.pending.clear()
+        self.pending_m2m.clear()
+        self.pending_count = 0
+        if self.on_flush:
+            self.on_flush(self)
+
+    def _insert(self, model, objs):
+        opts = model._meta
+        dated_fields = [
+            field for field in opts.concrete_fields
+            if getattr(field, 'auto_now_add', False)
+            or getattr(field, 'auto_now', False)
+        ]
+        for obj in objs:
+            for field in dated_fields:
+                if getattr(obj, field.attname) is None:
+                    setattr(obj, field.attname, self.now)
+        if model is Post:
+            for post in objs:
+                post.is_visible = bool(
+                    post.is_published and post.pub_date <= self.now)
+        with_pk = [obj for obj in objs if obj.pk is not None]
+        without_pk = [obj for obj in objs if obj.pk is None]
+        fields = list(opts.concrete_fields)
+        self._insert_rows(model, with_pk, fields)
+        self._insert_rows(model, without_pk, [
+            field for field in fields if field is not opts.auto_field])
+
+    def _insert_rows(self, model, objs, fields):
+        if not objs:
+            return
+        connection = connections[self.using]
+        size = min(self.batch_size,
+                   connection.ops.bulk_batch_size(fields, objs) or len(objs))
+        for start in range(0, len(objs), size):
+            # raw=True, как в loaddata: значения auto_now_add и других
+            # полей с pre_save берутся из фикстуры, а не пересчитываются.
+            model._base_manager._insert(
+                objs[start:start + size], fields=fields,
+                raw=True, using=self.using)
+
+    def reset_sequences(self):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), self.loaded_models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
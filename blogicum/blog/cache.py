@@ -0,0 +1,77 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from blog.models import Post
+
+GLOBAL_SCOPE = 'all'
+INDEX_SCOPE = 'index'
+
+SCOPE_KEY = 'blog:scope:{}'
+PAGE_KEY = 'blog:page:{}:{}'
+COUNT_KEY = 'blog:count:{}:{}'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def _initial_version():
+    # Версия из времени, а не с нуля: если ключ версии вытеснен из кэша,
+    # новая версия не совпадёт ни с одной из уже закэшированных.
+    return time.time_ns()
+
+
+def get_scope_versions(scopes):
+    keys = [SCOPE_KEY.format(scope) for scope in (GLOBAL_SCOPE, *scopes)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*scopes):
+    for scope in set(scopes):
+        key = SCOPE_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def invalidate_on_commit(scopes):
+    # Повторный сброс после коммита не даёт параллельному запросу
+    # закэшировать страницу с данными, прочитанными до коммита.
+    invalidate(*scopes)
+    transaction.on_commit(lambda: invalidate(*scopes))
+
+
+def get_post_scopes(post_ids):
+    scopes = {INDEX_SCOPE}
+    for category_slug, username in Post.objects.filter(
+        pk__in=post_ids
+    ).values_list('category__slug', 'author__username'):
+        if category_slug:
+            scopes.add(category_scope(category_slug))
+        scopes.add(profile_scope(username))
+    return scopes
+
+
+def page_cache_key(request, scopes):
+    path_hash = hashlib.md5(
+        request.get_full_path().encode()).hexdigest()
+    versions = '.'.join(str(v) for v in get_scope_versions(scopes))
+    return PAGE_KEY.format(path_hash, versions)
+
+
+def count_cache_key(scopes):
+    versions = '.'.join(str(v) for v in get_scope_versions(scopes))
+    return COUNT_KEY.format(','.join(scopes), versions)
@@ -0,0 +1,63 @@
+"""Распространение изменений категорий и местоположений на публикации.
+
+Зависимые публикации обходятся пачками по CASCADE_BATCH_SIZE, каждая
+в своей короткой транзакции: у них увеличивается cache_version, а при
+PUBLISHED_FEED_TABLE в записи ленты переносится видимость категории.
+Первая пачка обрабатывается сразу, остальные — фоновой задачей.
+
+Без таблицы ленты видимость категории проверяется при чтении и меняется
+сразу. С таблицей лента читается без соединения с категориями, поэтому
+публикации большой категории скрываются по мере работы задачи.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from blog import feed, jobs
+from blog.cache import GLOBAL_SCOPE, invalidate
+from blog.models import Post
+
+CASCADE_JOB = 'visibility_cascade'
+FIELDS = ('category', 'location')
+
+
+def dependent_posts(field, object_ids):
+    if field not in FIELDS:
+        raise ValueError(f'Неизвестное поле публикации: {field}')
+    return Post.objects.filter(**{f'{field}_id__in': object_ids})
+
+
+def _next_batch(field, posts, after):
+    # Обход по id: каждая пачка читается по индексу, без OFFSET.
+    post_ids = list(posts.filter(pk__gt=after).order_by('pk').values_list(
+        'pk', flat=True)[:settings.CASCADE_BATCH_SIZE])
+    with transaction.atomic():
+        Post.objects.filter(pk__in=post_ids).bump_cache_version()
+        if field == 'category' and settings.PUBLISHED_FEED_TABLE:
+            feed.sync_category_flags(post_ids)
+    return post_ids
+
+
+def cascade(field, object_ids):
+    """Обновляет публикации выбранных категорий или местоположений."""
+    post_ids = _next_batch(field, dependent_posts(field, object_ids), 0)
+    if len(post_ids) == settings.CASCADE_BATCH_SIZE:
+        jobs.enqueue(CASCADE_JOB, field=field, object_ids=list(object_ids),
+                     after=post_ids[-1])
+
+
+@jobs.handler(CASCADE_JOB)
+def run_cascade(field, object_ids, after=0):
+    posts = dependent_posts(field, object_ids)
+    total = posts.count()
+    done = posts.filter(pk__lte=after).count()
+    while True:
+        post_ids = _next_batch(field, posts, after)
+        done += len(post_ids)
+        jobs.report_progress(done, total)
+        if len(post_ids) < settings.CASCADE_BATCH_SIZE:
+            break
+        after = post_ids[-1]
+    # Страницы, закэшированные по ходу обработки, могли взять
+    # ещё не сброшенные карточки.
+    invalidate(GLOBAL_SCOPE)
+    return done
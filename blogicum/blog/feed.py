@@ -0,0 +1,92 @@
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from blog.cache import get_post_scopes, invalidate_on_commit
+from blog.models import Category, Post, PublishedFeedEntry
+from blog.scheduler import scheduled_posts
+
+BATCH_SIZE = 1000
+
+
+def visible_posts(now=None):
+    # Записи есть и у публикаций скрытых категорий: видимость категории
+    # хранится в category_is_published, и её смена не пересоздаёт ленту.
+    return Post.objects.filter(
+        pub_date__lte=now or timezone.now(),
+        is_published=True,
+        category__isnull=False,
+    )
+
+
+def _insert_entries(queryset):
+    inserted = 0
+    rows = queryset.filter(feed_entry__isnull=True).values_list(
+        'pk', 'pub_date', 'category_id', 'category__is_published'
+    ).order_by('pk')
+    batch = []
+    for post_id, pub_date, category_id, category_is_published in (
+            rows.iterator(BATCH_SIZE)):
+        batch.append(PublishedFeedEntry(
+            post_id=post_id, pub_date=pub_date, category_id=category_id,
+            category_is_published=category_is_published))
+        if len(batch) == BATCH_SIZE:
+            inserted += len(PublishedFeedEntry.objects.bulk_create(
+                batch, ignore_conflicts=True))
+            batch = []
+    if batch:
+        inserted += len(PublishedFeedEntry.objects.bulk_create(
+            batch, ignore_conflicts=True))
+    return inserted
+
+
+def sync_post(post):
+    category_is_published = visible_posts().filter(pk=post.pk).values_list(
+        'category__is_published', flat=True).first()
+    if category_is_published is not None:
+        PublishedFeedEntry.objects.update_or_create(
+            post_id=post.pk,
+            defaults={'pub_date': post.pub_date,
+                      'category_id': post.category_id,
+                      'category_is_published': category_is_published})
+    else:
+        PublishedFeedEntry.objects.filter(post_id=post.pk).delete()
+
+
+def sync_posts(post_ids):
+    PublishedFeedEntry.objects.filter(post_id__in=post_ids).delete()
+    return _insert_entries(visible_posts().filter(pk__in=post_ids))
+
+
+def sync_category_flags(post_ids):
+    """Переносит в записи ленты видимость категорий публикаций."""
+    return PublishedFeedEntry.objects.filter(post_id__in=post_ids).update(
+        category_is_published=Subquery(Category.objects.filter(
+            pk=OuterRef('category_id')).values('is_published')[:1]))
+
+
+def promote_due_posts(now=None, post_ids=None):
+    """Добавляет в ленту отложенные публикации, время которых наступило.
+
+    Кандидаты — id от планировщика или ещё не показанные отложенные
+    публикации (post_scheduled_idx), а не вся таблица: её обходит
+    только rebuild().
+    """
+    if post_ids is None:
+        candidates = scheduled_posts()
+    else:
+        candidates = Post.objects.filter(pk__in=post_ids)
+    with transaction.atomic():
+        due_ids = list((visible_posts(now) & candidates).filter(
+            feed_entry__isnull=True).values_list('pk', flat=True))
+        if not due_ids:
+            return 0
+        promoted = _insert_entries(Post.objects.filter(pk__in=due_ids))
+        invalidate_on_commit(get_post_scopes(due_ids))
+    return promoted
+
+
+def rebuild():
+    with transaction.atomic():
+        PublishedFeedEntry.objects.all().delete()
+        return _insert_entries(visible_posts())
@@ -0,0 +1,120 @@
+import io
+import logging
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from blog import jobs
+from blog.cache import get_post_scopes, invalidate_on_commit
+from blog.models import Post
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'posts_images/variants'
+PROCESS_IMAGE_JOB = 'post_image_variants'
+
+# Формат варианта → расширение файла и параметры Image.save.
+FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'optimize': True,
+                     'progressive': True}),
+}
+
+
+def get_widths(original_width):
+    # Без увеличения: маленькая картинка получает один вариант
+    # в исходном размере.
+    widths = [
+        width for width in settings.POST_IMAGE_WIDTHS
+        if width < original_width
+    ]
+    return widths + [min(original_width, max(settings.POST_IMAGE_WIDTHS))]
+
+
+def _encode(image, image_format):
+    _, options = FORMATS[image_format]
+    if image_format == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, quality=settings.POST_IMAGE_QUALITY, **options)
+    return buffer.getvalue()
+
+
+def build_variants(field_file):
+    """Сохраняет уменьшенные копии картинки и возвращает их описание."""
+    stem = PurePosixPath(field_file.name).stem
+    with field_file.open('rb'), Image.open(field_file) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'RGBA'):
+            original = original.convert(
+                'RGBA' if 'transparency' in original.info else 'RGB')
+        items = []
+        for width in get_widths(original.width):
+            resized = original.copy()
+            resized.thumbnail(
+                (width, original.height), Image.Resampling.LANCZOS)
+            for image_format, (extension, _) in FORMATS.items():
+                name = default_storage.save(
+                    f'{VARIANTS_DIR}/{stem}_{width}w.{extension}',
+                    ContentFile(_encode(resized, image_format)))
+                items.append({
+                    'name': name,
+                    'format': image_format,
+                    'width': resized.width,
+                    'height': resized.height,
+                })
+    return items
+
+
+def delete_variants(variants):
+    for item in variants.get('items', ()):
+        default_storage.delete(item['name'])
+
+
+def needs_processing(post):
+    source = post.image.name if post.image else ''
+    return post.image_variants.get('source', '') != source
+
+
+def sync_variants(post, force=False):
+    """Пересоздаёт варианты, если картинка публикации поменялась."""
+    if not force and not needs_processing(post):
+        return False
+    source = post.image.name if post.image else ''
+
+    delete_variants(post.image_variants)
+    variants = {}
+    if source:
+        try:
+            items = build_variants(post.image)
+        except (OSError, Image.DecompressionBombError):
+            # Битый файл не должен ломать сохранение публикации: шаблон
+            # покажет оригинал, а повторять попытку при каждом
+            # сохранении незачем.
+            logger.exception('Не удалось обработать %s', source)
+            items = []
+        variants = {'source': source, 'items': items}
+    post.image_variants = variants
+    Post.objects.filter(pk=post.pk).update(image_variants=variants)
+    return True
+
+
+@jobs.handler(PROCESS_IMAGE_JOB)
+def process_post_image(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'pk', 'image', 'image_variants').first()
+    if post is not None and sync_variants(post):
+        # Карточки и страницы, закэшированные до появления копий.
+        Post.objects.filter(pk=post_id).bump_cache_version()
+        invalidate_on_commit(get_post_scopes([post_id]))
+
+
+def get_srcset(items, image_format):
+    return ', '.join(
+        f'{default_storage.url(item["name"])} {item["width"]}w'
+        for item in items
+        if item['format'] == image_format
+    )
@@ -0,0 +1,144 @@
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(minutes=1)
+BATCH_SIZE = 100
+
+_handlers = {}
+_executor = None
+_executor_lock = threading.Lock()
+_current_job = threading.local()
+
+
+def handler(kind):
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, **payload):
+    # Задача сначала пишется в базу: невыполненные до перезапуска
+    # задачи подхватит пул потоков или manage.py run_jobs.
+    job = Job.objects.create(kind=kind, payload=payload)
+    if settings.JOB_QUEUE_MODE == 'sync':
+        run_job(job.pk)
+    elif settings.JOB_QUEUE_MODE == 'thread':
+        transaction.on_commit(lambda: _submit(run_job, job.pk))
+    return job
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.JOB_QUEUE_WORKERS,
+                thread_name_prefix='blog-jobs')
+            # Задачи, оставшиеся с прошлого запуска процесса.
+            _executor.submit(_in_thread, run_pending)
+        return _executor
+
+
+def _submit(func, *args):
+    _get_executor().submit(_in_thread, func, *args)
+
+
+def _in_thread(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Сбой фоновой задачи')
+    finally:
+        connections.close_all()
+
+
+def claim(job_id, now=None):
+    # Условный UPDATE: из нескольких потоков и процессов задачу
+    # получит только один.
+    now = now or timezone.now()
+    return Job.objects.filter(
+        pk=job_id, status=Job.Status.PENDING, run_after__lte=now
+    ).update(
+        status=Job.Status.RUNNING,
+        started_at=now,
+        attempts=F('attempts') + 1,
+    ) == 1
+
+
+def run_job(job_id):
+    if not claim(job_id):
+        return False
+    job = Job.objects.get(pk=job_id)
+    # Обработчик выполняется вне транзакции: долгая обработка не должна
+    # держать блокировку базы.
+    outer_job_id = getattr(_current_job, 'pk', None)
+    _current_job.pk = job.pk
+    try:
+        _handlers[job.kind](**job.payload)
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', job)
+        failed = job.attempts >= MAX_ATTEMPTS
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.FAILED if failed else Job.Status.PENDING,
+            error=traceback.format_exc(),
+            run_after=timezone.now() + RETRY_DELAY * job.attempts,
+            finished_at=timezone.now() if failed else None,
+        )
+    else:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.DONE, error='', finished_at=timezone.now())
+    finally:
+        _current_job.pk = outer_job_id
+    return True
+
+
+def report_progress(done, total):
+    """Сохраняет ход выполнения задачи, которую выполняет этот поток."""
+    job_id = getattr(_current_job, 'pk', None)
+    if job_id is not None:
+        Job.objects.filter(pk=job_id).update(progress=done, total=total)
+
+
+def due_jobs(now=None):
+    return Job.objects.filter(
+        status=Job.Status.PENDING, run_after__lte=now or timezone.now())
+
+
+def run_pending(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        job_ids = list(due_jobs().values_list('pk', flat=True)[:BATCH_SIZE])
+        if not job_ids:
+            break
+        for job_id in job_ids:
+            processed += run_job(job_id)
+    return processed
+
+
+def requeue_stale(older_than):
+    # Задачи, прерванные остановкой процесса, выполняются заново.
+    return Job.objects.filter(
+        status=Job.Status.RUNNING,
+        started_at__lt=timezone.now() - older_than,
+    ).update(status=Job.Status.PENDING)
+
+
+def purge_finished(older_than):
+    return Job.objects.filter(
+        status=Job.Status.DONE,
+        finished_at__lt=timezone.now() - older_than,
+    ).delete()[0]
@@ -0,0 +1,103 @@
+import bz2
+import gzip
+import sys
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from blog.bulkload import BATCH_SIZE, BulkLoader, iter_json_objects
+from blog.cache import GLOBAL_SCOPE, invalidate
+
+OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+}
+
+
+class Command(BaseCommand):
+    help = ('Быстро загружает JSON-фикстуры (массив dumpdata или JSON Lines) '
+            'пачками через INSERT на много строк, по транзакции на пачку.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures', nargs='+',
+            help='Пути к фикстурам; «-» читает стандартный ввод.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество объектов в одной транзакции.')
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='База данных для загрузки.')
+        parser.add_argument(
+            '-i', '--ignorenonexistent',
+            action='store_true',
+            help='Пропускать поля, которых нет в моделях.')
+        parser.add_argument(
+            '--skip-recount',
+            action='store_true',
+            help=('Не пересчитывать счётчики комментариев '
+                  'и таблицу ленты после загрузки.'))
+
+    def handle(self, *args, fixtures, batch_size, database,
+               ignorenonexistent=False, skip_recount=False, **options):
+        if batch_size < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        self.verbosity = options.get('verbosity', 1)
+        loader = BulkLoader(
+            using=database,
+            batch_size=batch_size,
+            ignorenonexistent=ignorenonexistent,
+            on_flush=self.report_progress,
+        )
+        for path in fixtures:
+            try:
+                with self.open_fixture(path) as stream:
+                    loader.load(iter_json_objects(stream))
+            except OSError as e:
+                raise CommandError(f'Не удалось прочитать {path}: {e}')
+            except (DeserializationError, DatabaseError) as e:
+                raise CommandError(f'Ошибка загрузки {path}: {e}')
+
+        for label, count in sorted(loader.counts.items()):
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {loader.total} за {loader.elapsed:.1f} с '
+            f'({self.rate(loader):.0f} строк/с)'))
+
+        if not skip_recount and loader.total:
+            self.recount(loader.counts)
+
+    def recount(self, counts):
+        # Сигналы при загрузке не отправлялись: пересчитываем то,
+        # что они поддерживают.
+        if 'blog.Comment' in counts or 'blog.Post' in counts:
+            call_command('recount_comments', stdout=self.stdout)
+        if 'blog.Post' in counts:
+            call_command('rebuild_media_refcounts', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+        if settings.PUBLISHED_FEED_TABLE:
+            call_command('sync_published_feed', '--rebuild',
+                         stdout=self.stdout)
+        invalidate(GLOBAL_SCOPE)
+
+    def open_fixture(self, path):
+        if path == '-':
+            return open(sys.stdin.fileno(), encoding='utf-8', closefd=False)
+        for extension, opener in OPENERS.items():
+            if path.endswith(extension):
+                return opener(path, 'rt', encoding='utf-8')
+        return open(path, encoding='utf-8')
+
+    def rate(self, loader):
+        return loader.total / loader.elapsed if loader.elapsed else 0
+
+    def report_progress(self, loader):
+        if self.verbosity >= 2:
+            self.stdout.write(
+                f'  {loader.total} объектов, {self.rate(loader):.0f} строк/с')
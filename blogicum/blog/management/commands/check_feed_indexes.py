@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.models import Category, Comment, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Проверяет по EXPLAIN, что запросы лент публикаций '
+            'и комментариев используют индексы.')
+
+    supported_vendors = ('sqlite', 'postgresql')
+
+    def get_feed_queries(self):
+        category = Category.objects.order_by('pk').first()
+        author = User.objects.order_by('pk').first()
+        post = Post.objects.order_by('pk').first()
+        return (
+            *self.get_published_feed_queries(category),
+            (
+                'Страница пользователя',
+                Post.objects.feed().filter(
+                    author_id=author.pk if author else 0),
+                ('post_author_pub_date_idx',),
+            ),
+            (
+                'Комментарии к публикации',
+                Comment.objects.filter(
+                    post_id=post.pk if post else 0
+                ).order_by('created_at', 'id'),
+                ('comment_post_created_idx',),
+            ),
+            (
+                'Комментарии пользователя',
+                Comment.objects.filter(
+                    author_id=author.pk if author else 0
+                ).order_by('-created_at'),
+                ('comment_author_created_idx',),
+            ),
+        )
+
+    def get_published_feed_queries(self, category):
+        if settings.PUBLISHED_FEED_TABLE:
+            # Ленты читаются из таблицы PublishedFeedEntry, как во вьюхах.
+            return (
+                (
+                    'Главная страница',
+                    Post.published_objects.feed(),
+                    ('feed_entry_pub_date_idx',),
+                ),
+                (
+                    'Страница категории',
+                    Post.published_objects.feed(
+                        category=category.pk if category else 0),
+                    ('feed_entry_category_idx',),
+                ),
+            )
+        return (
+            (
+                'Главная страница',
+                Post.published_objects.feed(),
+                ('post_published_pub_date_idx',),
+            ),
+            (
+                'Страница категории',
+                Post.published_objects.feed().filter(
+                    category_id=category.pk if category else 0),
+                ('post_category_pub_date_idx',),
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in self.supported_vendors:
+            raise CommandError(
+                f'Проверка планов не поддерживается для {connection.vendor}.')
+
+        missing = []
+        for label, queryset, index_names in self.get_feed_queries():
+            plan = queryset.explain()
+            self.stdout.write(f'{label}:\n{plan}\n')
+            if not any(name in plan for name in index_names):
+                missing.append(label)
+
+        if missing:
+            raise CommandError(
+                'Индексы не используются: ' + ', '.join(missing))
+        self.stdout.write(
+            self.style.SUCCESS('Все проверенные запросы используют индексы.'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from blog import images
+from blog.cache import GLOBAL_SCOPE, invalidate
+from blog.models import Post
+
+BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии фото для публикаций, '
+            'у которых их ещё нет.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии для всех публикаций с фото.')
+
+    def handle(self, *args, force=False, **options):
+        posts = Post.objects.exclude(image='').only(
+            'pk', 'image', 'image_variants').order_by('pk')
+        updated_ids = []
+        total = 0
+        for post in posts.iterator(BATCH_SIZE):
+            if images.sync_variants(post, force=force):
+                updated_ids.append(post.pk)
+            if len(updated_ids) == BATCH_SIZE:
+                total += self.bump(updated_ids)
+                updated_ids = []
+        total += self.bump(updated_ids)
+        if total:
+            invalidate(GLOBAL_SCOPE)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано публикаций: {total}'))
+
+    def bump(self, post_ids):
+        # Кэш карточек привязан к версии публикации.
+        return Post.objects.filter(pk__in=post_ids).bump_cache_version()
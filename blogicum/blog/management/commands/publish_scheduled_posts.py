@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.scheduler import next_publication_time, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = ('Открывает отложенные публикации, дата которых наступила. '
+            'С --loop работает постоянно и просыпается точно к дате '
+            'следующей публикации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать в цикле, не завершаясь.')
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=60,
+            help=('Максимальная пауза в секундах: за это время будут '
+                  'замечены новые отложенные публикации.'))
+
+    def handle(self, *args, loop=False, max_sleep=60, **options):
+        self.publish()
+        if not loop:
+            return
+        try:
+            while True:
+                time.sleep(self.get_sleep_seconds(max_sleep))
+                close_old_connections()
+                self.publish()
+        except KeyboardInterrupt:
+            pass
+
+    def publish(self):
+        count = publish_due_posts()
+        if count:
+            self.stdout.write(
+                self.style.SUCCESS(f'Опубликовано: {count}'))
+
+    def get_sleep_seconds(self, max_sleep):
+        next_time = next_publication_time()
+        if next_time is None:
+            return max_sleep
+        seconds = (next_time - timezone.now()).total_seconds()
+        return min(max(seconds, 0), max_sleep)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from blog import media
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает ссылки публикаций на файлы, хранящиеся '
+            'по хэшу содержимого.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help=('Сначала перенести фото, загруженные до хранения '
+                  'по хэшу, удалив дубликаты.'))
+        parser.add_argument(
+            '--delete-orphans',
+            action='store_true',
+            help='Удалить файлы, на которые не ссылается ни одна публикация.')
+
+    def handle(self, *args, convert=False, delete_orphans=False, **options):
+        if convert:
+            converted = media.convert_legacy_images()
+            self.stdout.write(f'Перенесено файлов: {converted}')
+        counts = media.rebuild_refcounts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлов: {len(counts)}, ссылок: {sum(counts.values())}'))
+        if delete_orphans:
+            deleted = media.delete_orphans()
+            self.stdout.write(f'Удалено файлов без ссылок: {deleted}')
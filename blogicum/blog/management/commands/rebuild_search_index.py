@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog import search
+
+
+class Command(BaseCommand):
+    help = 'Заполняет поисковый индекс публикаций заново.'
+
+    def handle(self, *args, **options):
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Публикаций в поисковом индексе: {count}'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчик комментариев у публикаций.'
+
+    def handle(self, *args, **options):
+        updated = Post.objects.update_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}'))
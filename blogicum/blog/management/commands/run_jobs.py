@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog import jobs
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из очереди. С --loop работает '
+            'постоянно и проверяет очередь каждые --interval секунд.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать в цикле, не завершаясь.')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help=('Через сколько секунд задача в состоянии «выполняется» '
+                  'считается прерванной и ставится в очередь снова.'))
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=7,
+            help='Сколько дней хранить выполненные задачи.')
+
+    def handle(self, *args, loop=False, interval=5, stale_after=600,
+               keep_days=7, **options):
+        requeued = jobs.requeue_stale(timedelta(seconds=stale_after))
+        if requeued:
+            self.stdout.write(f'Возвращено в очередь: {requeued}')
+        jobs.purge_finished(timedelta(days=keep_days))
+        self.run()
+        if not loop:
+            return
+        try:
+            while True:
+                close_old_connections()
+                if not self.run():
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def run(self):
+        count = jobs.run_pending()
+        if count:
+            self.stdout.write(
+                self.style.SUCCESS(f'Обработано задач: {count}'))
+        return count
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog import feed
+
+
+class Command(BaseCommand):
+    help = ('Добавляет в ленту опубликованного отложенные публикации, '
+            'время которых наступило.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Заполнить таблицу ленты заново.')
+
+    def handle(self, *args, rebuild=False, **options):
+        if rebuild:
+            count = feed.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS(f'Записей в ленте: {count}'))
+        else:
+            count = feed.promote_due_posts()
+            self.stdout.write(
+                self.style.SUCCESS(f'Добавлено в ленту: {count}'))
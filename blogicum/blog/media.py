@@ -0,0 +1,133 @@
+from collections import Counter
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from blog.models import MediaBlob, Post
+from core.storage import is_content_addressed
+
+
+def get_storage():
+    return Post._meta.get_field('image').storage
+
+
+def stored_image_name(post):
+    # Имя файла, уже сохранённого в базе; None, если поле отложено.
+    if 'image' not in post.__dict__:
+        return None
+    value = post.__dict__['image']
+    if isinstance(value, str):
+        return value
+    if getattr(value, '_committed', False):
+        return value.name or ''
+    return ''
+
+
+def _file_size(name):
+    try:
+        return get_storage().size(name)
+    except OSError:
+        return 0
+
+
+def acquire(name):
+    if not is_content_addressed(name):
+        return
+    blobs = MediaBlob.objects.filter(name=name)
+    if blobs.update(ref_count=F('ref_count') + 1):
+        return
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(
+                name=name, ref_count=1, size=_file_size(name))
+    except IntegrityError:
+        blobs.update(ref_count=F('ref_count') + 1)
+
+
+def release(name):
+    release_many([name])
+
+
+def release_many(names):
+    counts = Counter(name for name in names if is_content_addressed(name))
+    if not counts:
+        return
+    for name, count in counts.items():
+        MediaBlob.objects.filter(name=name).update(
+            ref_count=Greatest(F('ref_count') - count, 0))
+    orphans = MediaBlob.objects.filter(name__in=counts, ref_count=0)
+    orphaned_names = list(orphans.values_list('name', flat=True))
+    orphans.delete()
+    for name in orphaned_names:
+        transaction.on_commit(partial(delete_if_orphaned, name))
+
+
+def delete_if_orphaned(name):
+    # До коммита тот же файл могли загрузить снова.
+    if not MediaBlob.objects.filter(name=name).exists():
+        get_storage().delete(name)
+
+
+def convert_legacy_images():
+    """Переносит файлы, загруженные до хранения по хэшу."""
+    storage = get_storage()
+    legacy_names = set()
+    posts = Post.objects.exclude(image='').only(
+        'pk', 'image', 'image_variants').order_by('pk')
+    for post in posts.iterator():
+        old_name = post.image.name
+        if is_content_addressed(old_name) or not storage.exists(old_name):
+            continue
+        with storage.open(old_name) as content:
+            new_name = storage.save(old_name, content)
+        variants = post.image_variants
+        if variants.get('source') == old_name:
+            variants['source'] = new_name
+        Post.objects.filter(pk=post.pk).update(
+            image=new_name, image_variants=variants,
+            cache_version=F('cache_version') + 1)
+        legacy_names.add(old_name)
+    for name in legacy_names:
+        if not Post.objects.filter(image=name).exists():
+            storage.delete(name)
+    return len(legacy_names)
+
+
+def rebuild_refcounts():
+    counts = {
+        name: count
+        for name, count in Post.objects.exclude(image='').order_by().values(
+            'image').annotate(count=Count('pk')).values_list(
+            'image', 'count')
+        if is_content_addressed(name)
+    }
+    with transaction.atomic():
+        MediaBlob.objects.all().delete()
+        MediaBlob.objects.bulk_create([
+            MediaBlob(name=name, ref_count=count, size=_file_size(name))
+            for name, count in counts.items()
+        ])
+    return counts
+
+
+def iter_stored_names(path):
+    storage = get_storage()
+    directories, files = storage.listdir(path)
+    for directory in directories:
+        yield from iter_stored_names(f'{path}/{directory}')
+    for file_name in files:
+        yield f'{path}/{file_name}'
+
+
+def delete_orphans(upload_to='posts_images'):
+    if not get_storage().exists(upload_to):
+        return 0
+    referenced = set(MediaBlob.objects.values_list('name', flat=True))
+    deleted = 0
+    for name in iter_stored_names(upload_to):
+        if is_content_addressed(name) and name not in referenced:
+            get_storage().delete(name)
+            deleted += 1
+    return deleted
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='cache_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Версия для кэша'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_cache_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedFeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post')),
+                ('pub_date', models.DateTimeField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.category')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Лента опубликованного',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='publishedfeedentry',
+            index=models.Index(fields=['-pub_date'], name='feed_entry_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publishedfeedentry',
+            index=models.Index(fields=['category', '-pub_date'], name='feed_entry_category_idx'),
+        ),
+    ]
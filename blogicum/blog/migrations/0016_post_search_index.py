@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_post_search USING fts5('
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')")
+        schema_editor.execute(
+            'INSERT INTO blog_post_search (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post')
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE blog_post_search ('
+            'post_id bigint PRIMARY KEY '
+            'REFERENCES blog_post (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)')
+        schema_editor.execute(
+            'CREATE INDEX blog_post_search_document_idx '
+            'ON blog_post_search USING GIN (document)')
+        schema_editor.execute(
+            'INSERT INTO blog_post_search (post_id, document) '
+            "SELECT id, setweight(to_tsvector(%s, title), 'A') || "
+            "setweight(to_tsvector(%s, text), 'B') FROM blog_post",
+            (settings.SEARCH_CONFIG, settings.SEARCH_CONFIG))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_content_addressed_media'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
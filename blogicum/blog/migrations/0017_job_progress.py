@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='progress',
+            field=models.PositiveIntegerField(default=0, verbose_name='Обработано'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='total',
+            field=models.PositiveIntegerField(default=0, verbose_name='Всего'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:11
+
+from django.db import migrations, models
+
+
+def copy_category_is_published(apps, schema_editor):
+    PublishedFeedEntry = apps.get_model('blog', 'PublishedFeedEntry')
+    PublishedFeedEntry.objects.filter(
+        category__is_published=False
+    ).update(category_is_published=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_job_progress'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='publishedfeedentry',
+            name='feed_entry_pub_date_idx',
+        ),
+        migrations.AddField(
+            model_name='publishedfeedentry',
+            name='category_is_published',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(
+            copy_category_is_published, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='publishedfeedentry',
+            index=models.Index(condition=models.Q(('category_is_published', True)), fields=['-pub_date'], name='feed_entry_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def widen_post_id(apps, schema_editor):
+    # Базы, где 0016 создала столбец integer: id публикаций — bigint.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE blog_post_search ALTER COLUMN post_id TYPE bigint')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_feed_entry_category_is_published'),
+    ]
+
+    operations = [
+        migrations.RunPython(widen_post_id, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from blog.cache import INDEX_SCOPE, page_cache_key
+from blog.paginators import CursorPaginator
+
+
+class CursorPaginationMixin:
+    cursor_ordering = ('-pub_date', '-id')
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size,
+                                    ordering=self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CacheScopesMixin:
+    cache_scopes = (INDEX_SCOPE,)
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+
+class AnonymousPageCacheMixin(CacheScopesMixin):
+    def dispatch(self, request, *args, **kwargs):
+        if (not settings.PAGE_CACHE_TIMEOUT
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request, self.get_cache_scopes())
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            response.add_post_render_callback(
+                lambda r: cache.set(key, r, settings.PAGE_CACHE_TIMEOUT))
+        return response
+
+
+class CachedCountMixin(CacheScopesMixin):
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, count_cache_scopes=self.get_cache_scopes(), **kwargs)
+
+
+class SlugObjectMixin:
+    slug_object_model = None
+    slug_field = 'slug'
+    slug_url_kwarg = 'slug'
+
+    def get_slug_object_queryset(self):
+        return self.slug_object_model._default_manager.all()
+
+    def get_slug_object(self):
+        if not hasattr(self, '_slug_object'):
+            self._slug_object = get_object_or_404(
+                self.get_slug_object_queryset(),
+                **{self.slug_field: self.kwargs.get(self.slug_url_kwarg)})
+        return self._slug_object
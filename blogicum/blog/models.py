@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from core.models import BaseModel
+from core.storage import ContentAddressedStorage
 
 
 User = get_user_model()
@@ -41,14 +44,66 @@ class Location(BaseModel):
         return self.name
 
 
-class PublishedPostManager(models.Manager):
+class PostQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related('author', 'category', 'location')
+
+    def feed(self, category=None):
+        queryset = self.with_related().order_by('-pub_date')
+        if category is not None:
+            queryset = queryset.filter(category=category)
+        return queryset
+
+    def visible_to(self, user):
+        visible = models.Q(is_published=True, category__is_published=True)
+        if user.is_authenticated:
+            visible |= models.Q(author=user)
+        return self.filter(visible)
+
+    def bump_cache_version(self):
+        return self.update(cache_version=models.F('cache_version') + 1)
+
+    def update_comment_counts(self):
+        comment_counts = (
+            Comment.objects.filter(post=models.OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=models.Count('pk'))
+            .values('total')[:1]
+        )
+        return self.update(
+            comment_count=Coalesce(models.Subquery(comment_counts), 0),
+            cache_version=models.F('cache_version') + 1)
+
+
+class PublishedPostManager(models.Manager.from_queryset(PostQuerySet)):
     def get_queryset(self):
+        if settings.PUBLISHED_FEED_TABLE:
+            return super().get_queryset().filter(
+                feed_entry__category_is_published=True)
+        if settings.SCHEDULED_PUBLICATION:
+            # is_published оставлен ради частичных индексов ленты:
+            # is_visible без него не бывает.
+            return super().get_queryset().filter(
+                is_published=True,
+                is_visible=True,
+                category__is_published=True
+            )
         return super().get_queryset().filter(
             pub_date__lte=timezone.now(),
             is_published=True,
             category__is_published=True
         )
 
+    def feed(self, category=None):
+        if not settings.PUBLISHED_FEED_TABLE:
+            return super().feed(category)
+        queryset = self.get_queryset().with_related().order_by(
+            '-feed_entry__pub_date')
+        if category is not None:
+            queryset = queryset.filter(feed_entry__category=category)
+        return queryset
+
 
 class Post(BaseModel):
     title = models.CharField(
@@ -57,7 +112,12 @@ class Post(BaseModel):
     image = models.ImageField(
         verbose_name='Фото',
         upload_to='posts_images',
+        storage=ContentAddressedStorage(),
         blank=True)
+    image_variants = models.JSONField(
+        verbose_name='Уменьшенные копии фото',
+        default=dict,
+        editable=False)
     text = models.TextField(
         verbose_name='Текст',)
     pub_date = models.DateTimeField(
@@ -79,17 +139,88 @@ class Post(BaseModel):
         related_name='posts',
         verbose_name='Категория',
         on_delete=models.SET_NULL, null=True)
-    objects = models.Manager()
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False)
+    cache_version = models.PositiveBigIntegerField(
+        verbose_name='Версия для кэша',
+        default=0,
+        editable=False)
+    is_visible = models.BooleanField(
+        verbose_name='Видна в ленте',
+        help_text=('Выставляется при сохранении и планировщиком '
+                   'в момент наступления даты публикации.'),
+        default=False,
+        editable=False)
+    objects = PostQuerySet.as_manager()
     published_objects = PublishedPostManager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx'),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_pub_date_idx'),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_visible=False),
+                name='post_scheduled_idx'),
+        )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.is_visible = bool(
+            self.is_published and self.pub_date <= timezone.now())
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None and self.pk is not None
+                and not self._state.adding):
+            # Счётчик комментариев меняется только F-выражениями: значение,
+            # прочитанное формой или админкой, затёрло бы чужие изменения.
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count'
+            ]
+            kwargs['update_fields'] = update_fields
+        if update_fields is not None and (
+                {'is_published', 'pub_date'} & set(update_fields)):
+            kwargs['update_fields'] = {*update_fields, 'is_visible'}
+        if update_fields is not None and not self._state.adding:
+            # Версию для кэша увеличивает UPDATE (F-выражение из сигнала
+            # pre_save), а не значение, прочитанное вместе с публикацией.
+            kwargs['update_fields'] = {
+                *kwargs['update_fields'], 'cache_version'}
+        super().save(*args, **kwargs)
+        if hasattr(self.cache_version, 'resolve_expression'):
+            self.refresh_from_db(fields=['cache_version'])
+
+    @property
+    def image_ready(self):
+        return bool(
+            self.image
+            and self.image_variants.get('source') == self.image.name
+            and self.image_variants.get('items'))
+
+    @property
+    def fragment_cache_key(self):
+        # Время создания защищает от совпадения ключей, когда после
+        # удаления публикации её id достаётся новой записи.
+        return '{}.{}.{}'.format(
+            self.pk, self.cache_version,
+            int(self.created_at.timestamp() * 10 ** 6))
+
 
 class Comment(models.Model):
     text = models.TextField(
@@ -110,3 +241,124 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'),
+            models.Index(
+                fields=('author', '-created_at'),
+                name='comment_author_created_idx'),
+        )
+
+
+class PublishedFeedEntry(models.Model):
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        related_name='feed_entry',
+        on_delete=models.CASCADE)
+    pub_date = models.DateTimeField()
+    category = models.ForeignKey(
+        Category,
+        related_name='+',
+        on_delete=models.CASCADE)
+    # Копия Category.is_published: лента читается без соединения
+    # с категориями. После смены категории обновляется пачками
+    # в blog.cascade.
+    category_is_published = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Лента опубликованного'
+        ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(category_is_published=True),
+                name='feed_entry_pub_date_idx'),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='feed_entry_category_idx'),
+        )
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(
+        verbose_name='Файл',
+        max_length=255,
+        unique=True)
+    size = models.PositiveBigIntegerField(
+        verbose_name='Размер, байт',
+        default=0)
+    ref_count = models.PositiveIntegerField(
+        verbose_name='Количество ссылок',
+        default=0)
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено',
+        auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'файл медиа'
+        verbose_name_plural = 'Файлы медиа'
+
+    def __str__(self):
+        return self.name
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    kind = models.CharField(
+        verbose_name='Тип задачи',
+        max_length=64)
+    payload = models.JSONField(
+        verbose_name='Параметры',
+        default=dict)
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0)
+    error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True)
+    run_after = models.DateTimeField(
+        verbose_name='Не раньше',
+        default=timezone.now)
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено',
+        auto_now_add=True)
+    started_at = models.DateTimeField(
+        verbose_name='Начата',
+        null=True,
+        blank=True)
+    finished_at = models.DateTimeField(
+        verbose_name='Завершена',
+        null=True,
+        blank=True)
+    progress = models.PositiveIntegerField(
+        verbose_name='Обработано',
+        default=0)
+    total = models.PositiveIntegerField(
+        verbose_name='Всего',
+        default=0)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='job_status_run_after_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk}'
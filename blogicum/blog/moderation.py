@@ -0,0 +1,143 @@
+"""Массовые действия модерации.
+
+Каждое действие обновляет или удаляет выбранные записи пачками
+по BATCH_SIZE одним запросом на пачку, минуя сигналы отдельных объектов;
+счётчики, лента, поиск, ссылки на файлы и кэш поддерживаются здесь же.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from blog import cascade, feed, images, media, search
+from blog.cache import GLOBAL_SCOPE, get_post_scopes, invalidate_on_commit
+from blog.models import Category, Comment, Location, Post, PublishedFeedEntry
+
+# Не больше параметров в одном запросе, чем допускает SQLite.
+BATCH_SIZE = 500
+
+
+def _batches(queryset):
+    # id фиксируются заранее: после обновления фильтры выборки в админке
+    # могут перестать ей соответствовать.
+    ids = list(queryset.order_by().values_list('pk', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def _raw_delete(queryset):
+    # Удаление без сигналов: их работа сделана для всей пачки сразу.
+    return queryset._raw_delete(queryset.db)
+
+
+def _update_posts(queryset, **fields):
+    updated = 0
+    with transaction.atomic():
+        for post_ids in _batches(queryset):
+            scopes = get_post_scopes(post_ids)
+            updated += Post.objects.filter(pk__in=post_ids).update(
+                cache_version=F('cache_version') + 1, **fields)
+            if settings.PUBLISHED_FEED_TABLE:
+                feed.sync_posts(post_ids)
+            invalidate_on_commit(scopes | get_post_scopes(post_ids))
+    return updated
+
+
+def set_posts_published(queryset, is_published):
+    if is_published:
+        is_visible = Case(
+            When(pub_date__lte=timezone.now(), then=True), default=False)
+    else:
+        is_visible = False
+    return _update_posts(
+        queryset, is_published=is_published, is_visible=is_visible)
+
+
+def set_posts_category(queryset, category):
+    return _update_posts(queryset, category=category)
+
+
+def _delete_variants(variants_list):
+    for variants in variants_list:
+        images.delete_variants(variants)
+
+
+def delete_posts(queryset):
+    deleted = 0
+    with transaction.atomic():
+        for post_ids in _batches(queryset):
+            scopes = get_post_scopes(post_ids)
+            posts = Post.objects.filter(pk__in=post_ids)
+            files = list(posts.values_list('image', 'image_variants'))
+            _raw_delete(Comment.objects.filter(post_id__in=post_ids))
+            _raw_delete(
+                PublishedFeedEntry.objects.filter(post_id__in=post_ids))
+            deleted += _raw_delete(posts)
+            media.release_many(name for name, _ in files)
+            search.remove_posts(post_ids)
+            transaction.on_commit(partial(
+                _delete_variants, [variants for _, variants in files]))
+            invalidate_on_commit(scopes)
+    return deleted
+
+
+def delete_comments(queryset):
+    deleted = 0
+    with transaction.atomic():
+        for comment_ids in _batches(queryset):
+            comments = Comment.objects.filter(pk__in=comment_ids)
+            post_ids = set(comments.values_list('post_id', flat=True))
+            deleted += _raw_delete(comments)
+            Post.objects.filter(pk__in=post_ids).update_comment_counts()
+            invalidate_on_commit(get_post_scopes(post_ids))
+    return deleted
+
+
+def set_categories_published(queryset, is_published):
+    updated = 0
+    with transaction.atomic():
+        for category_ids in _batches(queryset):
+            updated += Category.objects.filter(pk__in=category_ids).update(
+                is_published=is_published)
+            cascade.cascade('category', category_ids)
+        invalidate_on_commit({GLOBAL_SCOPE})
+    return updated
+
+
+def delete_categories(queryset):
+    deleted = 0
+    with transaction.atomic():
+        for category_ids in _batches(queryset):
+            _raw_delete(PublishedFeedEntry.objects.filter(
+                category_id__in=category_ids))
+            Post.objects.filter(category_id__in=category_ids).update(
+                category=None, cache_version=F('cache_version') + 1)
+            deleted += _raw_delete(
+                Category.objects.filter(pk__in=category_ids))
+        invalidate_on_commit({GLOBAL_SCOPE})
+    return deleted
+
+
+def set_locations_published(queryset, is_published):
+    updated = 0
+    with transaction.atomic():
+        for location_ids in _batches(queryset):
+            updated += Location.objects.filter(pk__in=location_ids).update(
+                is_published=is_published)
+            cascade.cascade('location', location_ids)
+        invalidate_on_commit({GLOBAL_SCOPE})
+    return updated
+
+
+def delete_locations(queryset):
+    deleted = 0
+    with transaction.atomic():
+        for location_ids in _batches(queryset):
+            Post.objects.filter(location_id__in=location_ids).update(
+                location=None, cache_version=F('cache_version') + 1)
+            deleted += _raw_delete(
+                Location.objects.filter(pk__in=location_ids))
+        invalidate_on_commit({GLOBAL_SCOPE})
+    return deleted
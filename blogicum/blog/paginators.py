@@ -0,0 +1,220 @@
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blog.cache import count_cache_key
+
+# Границы 64-битного столбца: SQLite диапазон не проверяет.
+MIN_INT = -2 ** 63
+MAX_INT = 2 ** 63 - 1
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder отбрасывает микросекунды, а позиции курсора
+        # нужна полная точность.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorPage(Sequence):
+    is_cursor = True
+
+    def __init__(self, object_list, has_next, has_previous,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %d items>' % len(self)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинатор: страница выбирается условием по ключу сортировки.
+
+    Вместо OFFSET и COUNT(*) используется позиция последней (или первой)
+    записи на странице, закодированная в непрозрачный токен, поэтому
+    стоимость любой страницы равна стоимости первой.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def encode_cursor(self, direction, obj):
+        values = [getattr(obj, field.lstrip('-')) for field in self.ordering]
+        payload = json.dumps([direction, values], cls=CursorEncoder)
+        return base64.urlsafe_b64encode(
+            payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(payload)
+            if (direction not in (self.NEXT, self.PREVIOUS)
+                    or len(values) != len(self.ordering)):
+                raise ValueError
+            values = [
+                self._clean_value(field, value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (binascii.Error, OverflowError, TypeError, ValueError,
+                ValidationError):
+            raise InvalidPage('Некорректный курсор страницы.')
+        return direction, values
+
+    def _clean_value(self, field_name, value):
+        # Токен приходит от клиента: None и числа вне диапазона столбца
+        # отклоняются до построения запроса.
+        field = self.queryset.model._meta.get_field(field_name.lstrip('-'))
+        value = field.to_python(value)
+        if value is None:
+            raise ValueError
+        if isinstance(value, int) and not MIN_INT <= value <= MAX_INT:
+            raise OverflowError
+        field.run_validators(value)
+        return value
+
+    def _position_filter(self, values, reverse):
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith('-') != reverse
+            lookup = '%s__%s' % (field.lstrip('-'), 'lt' if descending
+                                 else 'gt')
+            step = Q(**{lookup: values[index]})
+            for previous, value in zip(self.ordering[:index], values):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return tuple(
+            field[1:] if field.startswith('-') else '-' + field
+            for field in self.ordering
+        )
+
+    def page(self, cursor=None):
+        if not cursor:
+            direction, queryset = self.NEXT, self.queryset.order_by(
+                *self.ordering)
+        else:
+            direction, values = self.decode_cursor(cursor)
+            reverse = direction == self.PREVIOUS
+            queryset = self.queryset.filter(
+                self._position_filter(values, reverse)
+            ).order_by(*(self._reversed_ordering() if reverse
+                         else self.ordering))
+
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if direction == self.PREVIOUS:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        return CursorPage(
+            object_list,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=(self.encode_cursor(self.NEXT, object_list[-1])
+                         if has_next and object_list else None),
+            previous_cursor=(
+                self.encode_cursor(self.PREVIOUS, object_list[0])
+                if has_previous and object_list else None),
+        )
+
+
+class FeedPaginator(Paginator):
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, *args, count_cache_scopes=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_scopes = count_cache_scopes
+
+    @cached_property
+    def count(self):
+        if self.count_cache_scopes is None:
+            return super().count
+        key = count_cache_key(self.count_cache_scopes)
+        count = cache.get(key)
+        if count is None:
+            count = self.estimate_count()
+            if count is None:
+                count = super().count
+            cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+        return count
+
+    def estimate_count(self):
+        threshold = settings.COUNT_ESTIMATE_THRESHOLD
+        query = getattr(self.object_list, 'query', None)
+        connection = connections[getattr(self.object_list, 'db', 'default')]
+        if not threshold or query is None or (
+                connection.vendor != 'postgresql'):
+            return None
+        sql, params = query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        return estimate if estimate >= threshold else None
+
+    def page(self, number):
+        page = super().page(number)
+        page.page_range = list(self.get_elided_page_range(
+            page.number, on_each_side=self.on_each_side,
+            on_ends=self.on_ends))
+        return page
+
+
+class EstimatedCountPaginator(FeedPaginator):
+    """Пагинатор админки: оценка числа строк вместо COUNT(*).
+
+    Оценка берётся из плана запроса PostgreSQL, когда строк больше
+    COUNT_ESTIMATE_THRESHOLD; иначе считается точно.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate_count()
+        return super().count if estimate is None else estimate
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models import F, Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog.cache import get_post_scopes, invalidate_on_commit
+from blog.models import Post
+
+posts_published = Signal()
+
+
+def scheduled_posts():
+    return Post.objects.filter(is_published=True, is_visible=False)
+
+
+def publish_due_posts(now=None):
+    now = now or timezone.now()
+    with transaction.atomic():
+        due_ids = list(scheduled_posts().filter(
+            pub_date__lte=now).values_list('pk', flat=True))
+        if due_ids:
+            Post.objects.filter(pk__in=due_ids).update(
+                is_visible=True, cache_version=F('cache_version') + 1)
+            invalidate_on_commit(get_post_scopes(due_ids))
+            posts_published.send(sender=Post, post_ids=due_ids, now=now)
+    return len(due_ids)
+
+
+def next_publication_time():
+    return scheduled_posts().aggregate(next=Min('pub_date'))['next']
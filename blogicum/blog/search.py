@@ -0,0 +1,175 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from blog.models import Post
+
+SEARCH_TABLE = 'blog_post_search'
+TERM = re.compile(r'\w+')
+# Совпадение в заголовке весит больше, чем в тексте.
+TITLE_WEIGHT = 10.0
+
+
+def get_terms(query):
+    return TERM.findall(query.lower())
+
+
+class IcontainsBackend:
+    """Поиск без индекса: LIKE по заголовку и тексту каждой публикации."""
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(text__icontains=term))
+        return queryset.order_by('-pub_date')
+
+    def index_post(self, post):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class SQLiteBackend:
+    """Виртуальная таблица FTS5, rowid записи совпадает с id публикации."""
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset.none()
+        # Каждое слово ищется как префикс: у FTS5 нет стемминга.
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.extra(
+            select={'search_rank': f'bm25({SEARCH_TABLE}, %s, 1.0)'},
+            select_params=(TITLE_WEIGHT,),
+            tables=(SEARCH_TABLE,),
+            where=(
+                f'{SEARCH_TABLE}.rowid = {Post._meta.db_table}.id',
+                f'{SEARCH_TABLE} MATCH %s',
+            ),
+            params=(match,),
+        ).order_by('search_rank', '-pub_date')
+
+    def index_post(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (post.pk,))
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)', (post.pk, post.title, post.text))
+
+    def remove_posts(self, post_ids):
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} '
+                f'WHERE rowid IN ({placeholders})', list(post_ids))
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+                f'SELECT id, title, text FROM {Post._meta.db_table}')
+            return cursor.rowcount
+
+
+class PostgreSQLBackend:
+    """Таблица с tsvector под GIN-индексом, ключ — id публикации."""
+
+    document = ("setweight(to_tsvector(%s, {title}), 'A') || "
+                "setweight(to_tsvector(%s, {text}), 'B')")
+
+    def search(self, queryset, query):
+        if not get_terms(query):
+            return queryset.none()
+        tsquery = 'plainto_tsquery(%s, %s)'
+        params = (settings.SEARCH_CONFIG, query)
+        return queryset.extra(
+            # Знак минус: меньший ранг — лучше, как у bm25 в SQLite.
+            select={'search_rank': (
+                f'-ts_rank({SEARCH_TABLE}.document, {tsquery})')},
+            select_params=params,
+            tables=(SEARCH_TABLE,),
+            where=(
+                f'{SEARCH_TABLE}.post_id = {Post._meta.db_table}.id',
+                f'{SEARCH_TABLE}.document @@ {tsquery}',
+            ),
+            params=params,
+        ).order_by('search_rank', '-pub_date')
+
+    def index_post(self, post):
+        document = self.document.format(title='%s', text='%s')
+        config = settings.SEARCH_CONFIG
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (post_id, document) '
+                f'VALUES (%s, {document}) '
+                'ON CONFLICT (post_id) DO UPDATE '
+                'SET document = EXCLUDED.document',
+                (post.pk, config, post.title, config, post.text))
+
+    def remove_posts(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE post_id = ANY(%s)',
+                (list(post_ids),))
+
+    def rebuild(self):
+        document = self.document.format(title='title', text='text')
+        config = settings.SEARCH_CONFIG
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (post_id, document) '
+                f'SELECT id, {document} FROM {Post._meta.db_table}',
+                (config, config))
+            return cursor.rowcount
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgreSQLBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    # Один объект на процесс: бэкенд может держать индекс в памяти.
+    return import_string(path)()
+
+
+def get_backend():
+    if settings.SEARCH_BACKEND:
+        return _load_backend(settings.SEARCH_BACKEND)
+    return BACKENDS.get(connection.vendor, IcontainsBackend)()
+
+
+def search(query, queryset=None):
+    """Опубликованные публикации, подходящие под запрос, лучшие первыми."""
+    if queryset is None:
+        queryset = Post.published_objects.with_related()
+    return get_backend().search(queryset, query)
+
+
+def index_post(post):
+    get_backend().index_post(post)
+
+
+def remove_posts(post_ids):
+    if post_ids:
+        get_backend().remove_posts(post_ids)
+
+
+def rebuild():
+    return get_backend().rebuild()
@@ -0,0 +1,499 @@
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from collections.abc import Sequence
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from itertools import chain
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import snowballstemmer
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from blog.models import Post
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r'\w+')
+CYRILLIC = re.compile('[а-я]')
+# Слова заголовка учитываются несколько раз: упрощённый BM25F.
+TITLE_BOOST = 3
+K1 = 1.2
+B = 0.75
+MAX_FREQ = 0xFFFF
+CHAMPIONS = 1000
+CHAMPION_MIN_DF = 10 * CHAMPIONS
+BATCH_SIZE = 2000
+
+MAGIC = b'BLOGIDX2'
+# Метка, число документов, число терминов, суммарная длина документов,
+# размер словаря в байтах.
+HEADER = struct.Struct('<8sIIQQ')
+
+Postings = namedtuple('Postings', ('docs', 'freqs', 'champions'))
+
+_stemmers = {
+    'ru': snowballstemmer.stemmer('russian'),
+    'en': snowballstemmer.stemmer('english'),
+}
+_stem_lock = threading.Lock()
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    language = 'ru' if CYRILLIC.search(word) else 'en'
+    # Стеммеры snowballstemmer хранят состояние в объекте.
+    with _stem_lock:
+        return _stemmers[language].stemWord(word)
+
+
+def tokenize(text):
+    return [
+        stem(word) for word in WORD.findall(text.lower().replace('ё', 'е'))
+    ]
+
+
+def record_size(df, champion_count):
+    # Номера документов, лучшие документы, частоты, выравнивание.
+    return 4 * df + 4 * champion_count + 2 * df + 2 * df % 4
+
+
+def get_champions(docs, freqs, norms):
+    """Лучшие по BM25 документы частого термина, по возрастанию номера."""
+    if len(docs) <= CHAMPION_MIN_DF:
+        return array('I')
+    best = heapq.nlargest(
+        CHAMPIONS, range(len(docs)),
+        key=lambda i: freqs[i] / (freqs[i] + norms[docs[i]]))
+    return array('I', sorted(docs[i] for i in best))
+
+
+def document_terms(title, text):
+    terms = Counter(tokenize(text))
+    for term in tokenize(title):
+        terms[term] += TITLE_BOOST
+    return terms
+
+
+class InvertedIndex:
+    """Инвертированный индекс: термин → номера документов и частоты.
+
+    Номера документов растут в порядке добавления, поэтому списки
+    вхождений отсортированы и в них работает двоичный поиск. Удалённый
+    документ только помечается и выбрасывается при сохранении. Списки
+    загруженного индекса читаются из mmap и копируются в память, только
+    когда в них добавляется документ.
+
+    Для частых терминов при сохранении запоминаются CHAMPIONS лучших
+    документов: запрос только из частых слов оценивает лишь их, и его
+    результат приблизительный.
+    """
+
+    def __init__(self):
+        # Id публикаций 64-битные, как у BigAutoField.
+        self.doc_ids = array('Q')
+        self.lengths = array('I')
+        self.deleted = bytearray()
+        self.doc_numbers = {}
+        self.live_count = 0
+        self.total_length = 0
+        self.postings = {}
+        self._base_doc_count = 0
+        self._base_terms = {}
+        self._base_dfs = self._base_champion_counts = None
+        self._base_offsets = self._base_postings = None
+
+    def __len__(self):
+        return self.live_count
+
+    def terms(self):
+        return self._base_terms.keys() | self.postings.keys()
+
+    def get_postings(self, term):
+        if term in self.postings:
+            return self.postings[term]
+        number = self._base_terms.get(term)
+        if number is None:
+            return None
+        df = self._base_dfs[number]
+        champion_count = self._base_champion_counts[number]
+        view = self._base_postings[self._base_offsets[number]:]
+        champions_end = 4 * df + 4 * champion_count
+        return Postings(
+            docs=view[:4 * df].cast('I'),
+            freqs=view[champions_end:champions_end + 2 * df].cast('H'),
+            champions=(view[4 * df:champions_end].cast('I')
+                       if champion_count else None))
+
+    def _writable_postings(self, term):
+        if term not in self.postings:
+            postings = Postings(array('I'), array('H'), None)
+            base = self.get_postings(term)
+            if base is not None:
+                postings.docs.frombytes(base.docs.tobytes())
+                postings.freqs.frombytes(base.freqs.tobytes())
+                postings = postings._replace(champions=base.champions)
+            self.postings[term] = postings
+        return self.postings[term]
+
+    def add(self, doc_id, terms):
+        self.remove(doc_id)
+        number = len(self.doc_ids)
+        length = sum(terms.values())
+        self.doc_ids.append(doc_id)
+        self.lengths.append(length)
+        self.deleted.append(0)
+        self.doc_numbers[doc_id] = number
+        self.live_count += 1
+        self.total_length += length
+        for term, freq in terms.items():
+            postings = self._writable_postings(term)
+            postings.docs.append(number)
+            postings.freqs.append(min(freq, MAX_FREQ))
+
+    def remove(self, doc_id):
+        number = self.doc_numbers.pop(doc_id, None)
+        if number is not None:
+            self.deleted[number] = 1
+            self.live_count -= 1
+            self.total_length -= self.lengths[number]
+
+    def search(self, terms, limit):
+        """Id документов со всеми терминами, лучшие по BM25 первыми."""
+        postings = [self.get_postings(term) for term in set(terms)]
+        if not postings or None in postings or not self.live_count:
+            return []
+        # Кандидаты берутся из самого редкого термина, остальные
+        # проверяются двоичным поиском.
+        postings.sort(key=lambda item: len(item.docs))
+        candidates = postings[0].docs
+        if len(candidates) > CHAMPION_MIN_DF:
+            champions = [self._champions(item) for item in postings]
+            if None not in champions:
+                candidates = sorted(set().union(*champions))
+        return [
+            self.doc_ids[number]
+            for _, number in heapq.nlargest(
+                limit, self._score(candidates, postings))
+        ]
+
+    def idf(self, df):
+        return math.log(1 + (self.live_count - df + 0.5) / (df + 0.5))
+
+    def _champions(self, postings):
+        if postings.champions is None:
+            return None
+        # Добавленные после загрузки документы проверяются все.
+        added = bisect_left(postings.docs, self._base_doc_count)
+        return chain(postings.champions, postings.docs[added:])
+
+    def _score(self, candidates, postings):
+        idfs = [self.idf(len(item.docs)) for item in postings]
+        positions = [0] * len(postings)
+        deleted, lengths = self.deleted, self.lengths
+        average_length = self.total_length / self.live_count
+        for number in candidates:
+            if deleted[number]:
+                continue
+            freqs = []
+            for index, (docs, term_freqs, _) in enumerate(postings):
+                position = bisect_left(docs, number, positions[index])
+                positions[index] = position
+                if position == len(docs) or docs[position] != number:
+                    break
+                freqs.append(term_freqs[position])
+            else:
+                norm = K1 * (1 - B + B * lengths[number] / average_length)
+                yield sum(
+                    idf * freq * (K1 + 1) / (freq + norm)
+                    for idf, freq in zip(idfs, freqs)
+                ), number
+
+    def _compacted(self):
+        """Списки индекса без удалённых документов, с новыми номерами."""
+        live = [
+            number for number in range(len(self.doc_ids))
+            if not self.deleted[number]
+        ]
+        renumber = {old: new for new, old in enumerate(live)}
+        doc_ids = array('Q', (self.doc_ids[number] for number in live))
+        lengths = array('I', (self.lengths[number] for number in live))
+        postings = {}
+        for term in self.terms():
+            docs, freqs, _ = self.get_postings(term)
+            if len(renumber) < len(self.doc_ids):
+                pairs = [
+                    (renumber[number], freq)
+                    for number, freq in zip(docs, freqs)
+                    if number in renumber
+                ]
+                if not pairs:
+                    continue
+                docs = array('I', (number for number, _ in pairs))
+                freqs = array('H', (freq for _, freq in pairs))
+            postings[term] = docs, freqs
+        return doc_ids, lengths, postings
+
+    def save(self, path):
+        doc_ids, lengths, postings = self._compacted()
+        terms = sorted(postings)
+        average_length = self.total_length / max(len(doc_ids), 1)
+        norms = [K1 * (1 - B + B * length / average_length)
+                 for length in lengths]
+        champions = [get_champions(*postings[term], norms) for term in terms]
+        dfs = array('I', (len(postings[term][0]) for term in terms))
+        champion_counts = array('I', map(len, champions))
+        offsets = array('Q')
+        offset = 0
+        for df, champion_count in zip(dfs, champion_counts):
+            offsets.append(offset)
+            offset += record_size(df, champion_count)
+        vocabulary = '\n'.join(terms).encode()
+
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, len(doc_ids), len(terms),
+                                   self.total_length, len(vocabulary)))
+            # 64-битные массивы первыми: они выровнены по 8 байтам.
+            for chunk in (doc_ids, offsets, lengths, dfs, champion_counts,
+                          vocabulary):
+                file.write(chunk)
+            for term, term_champions in zip(terms, champions):
+                docs, freqs = postings[term]
+                file.write(docs)
+                file.write(term_champions)
+                file.write(freqs)
+                # Выравнивание следующей записи по 4 байтам.
+                file.write(bytes(2 * len(docs) % 4))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, doc_count, term_count, total_length,
+         vocabulary_size) = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(
+                f'{path} не является поисковым индексом этой версии, '
+                'перестройте его: manage.py rebuild_search_index')
+        view = memoryview(buffer)
+        position = HEADER.size
+
+        def take(size):
+            nonlocal position
+            position += size
+            return view[position - size:position]
+
+        index.doc_ids.frombytes(take(8 * doc_count))
+        index._base_offsets = take(8 * term_count).cast('Q')
+        index.lengths.frombytes(take(4 * doc_count))
+        index._base_dfs = take(4 * term_count).cast('I')
+        index._base_champion_counts = take(4 * term_count).cast('I')
+        vocabulary = bytes(take(vocabulary_size)).decode()
+        index._base_postings = view[position:]
+        if term_count:
+            index._base_terms = {
+                term: number
+                for number, term in enumerate(vocabulary.split('\n'))
+            }
+        index._base_doc_count = doc_count
+        index.deleted = bytearray(doc_count)
+        index.doc_numbers = {
+            doc_id: number for number, doc_id in enumerate(index.doc_ids)
+        }
+        index.live_count = doc_count
+        index.total_length = total_length
+        return index
+
+
+class RankedPosts(Sequence):
+    """Найденные публикации в порядке ранга для Paginator.
+
+    Видимость id проверяется одним запросом, а строки загружаются
+    только для запрошенной страницы.
+    """
+
+    def __init__(self, queryset, ids):
+        self.queryset = queryset
+        self.ids = ids
+
+    @cached_property
+    def visible_ids(self):
+        visible = set(self.queryset.filter(
+            pk__in=self.ids).values_list('pk', flat=True))
+        return [pk for pk in self.ids if pk in visible]
+
+    def __len__(self):
+        return len(self.visible_ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1 or None][0]
+        ids = self.visible_ids[index]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+class InvertedIndexBackend:
+    """Поиск по собственному индексу в файле, без поиска средствами СУБД.
+
+    Базовый индекс читается через mmap. Изменения публикаций после
+    фиксации транзакции дописываются в журнал рядом с ним, и каждый
+    процесс сайта применяет новые записи журнала перед поиском.
+    manage.py rebuild_search_index строит базовый индекс заново.
+    """
+
+    max_results = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_state = None
+        self._journal_inode = None
+        self._journal_position = 0
+
+    @property
+    def path(self):
+        return str(settings.SEARCH_INDEX_PATH)
+
+    @property
+    def journal_path(self):
+        return f'{self.path}.log'
+
+    def _file_state(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self.path, None
+        return self.path, (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def get_index(self):
+        with self._lock:
+            state = self._file_state()
+            if self._index is None or state != self._index_state:
+                self._index = (InvertedIndex.load(self.path) if state[1]
+                               else InvertedIndex())
+                self._index_state = state
+                self._journal_inode = None
+            self._replay_journal()
+            return self._index
+
+    def _replay_journal(self):
+        try:
+            file = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with file:
+            stat = os.fstat(file.fileno())
+            if (stat.st_ino != self._journal_inode
+                    or stat.st_size < self._journal_position):
+                # Журнал заменён при перестроении: записи применяются
+                # заново, повторное применение ничего не меняет.
+                self._journal_inode = stat.st_ino
+                self._journal_position = 0
+            file.seek(self._journal_position)
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                self._journal_position += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Запись, оборванная упавшим процессом, пропускается.
+                    logger.warning('Повреждённая запись журнала %s',
+                                   self.journal_path)
+                    continue
+                if 'terms' in entry:
+                    self._index.add(entry['id'], entry['terms'])
+                else:
+                    self._index.remove(entry['id'])
+
+    @contextmanager
+    def _journal_lock(self):
+        # Отдельный файл блокировки: журнал заменяется при перестроении.
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f'{self.journal_path}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _append(self, entry):
+        self._append_many([entry])
+
+    def _append_many(self, entries):
+        data = ''.join(
+            json.dumps(entry, ensure_ascii=False) + '\n'
+            for entry in entries).encode()
+        with self._journal_lock():
+            fd = os.open(self.journal_path,
+                         os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Записи уходят одним write: другие процессы сайта
+                # не увидят половину строки.
+                written = os.write(fd, data)
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+            finally:
+                os.close(fd)
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+        ids = self.get_index().search(terms, self.max_results)
+        if not ids:
+            return queryset.none()
+        return RankedPosts(queryset, ids)
+
+    def index_post(self, post):
+        entry = {'id': post.pk, 'terms': document_terms(post.title, post.text)}
+        transaction.on_commit(partial(self._append, entry))
+
+    def remove_posts(self, post_ids):
+        transaction.on_commit(partial(
+            self._append_many, [{'id': post_id} for post_id in post_ids]))
+
+    def rebuild(self):
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            journal_size = 0
+        index = InvertedIndex()
+        rows = Post.objects.order_by('pk').values_list('pk', 'title', 'text')
+        for pk, title, text in rows.iterator(BATCH_SIZE):
+            index.add(pk, document_terms(title, text))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        index.save(self.path)
+        self._trim_journal(journal_size)
+        return len(index)
+
+    def _trim_journal(self, start):
+        # Записи, дописанные во время перестроения, остаются в журнале.
+        with self._journal_lock():
+            try:
+                with open(self.journal_path, 'rb') as file:
+                    file.seek(start)
+                    tail = file.read()
+            except FileNotFoundError:
+                return
+            temp_path = f'{self.journal_path}.tmp'
+            with open(temp_path, 'wb') as file:
+                file.write(tail)
+            os.replace(temp_path, self.journal_path)
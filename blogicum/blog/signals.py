@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from blog import cascade, feed, images, jobs, media, search
+from blog.cache import GLOBAL_SCOPE, get_post_scopes, invalidate_on_commit
+from blog.models import Category, Comment, Location, Post, User
+from blog.scheduler import posts_published
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            cache_version=F('cache_version') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1,
+             cache_version=F('cache_version') + 1)
+
+
+@receiver(pre_save, sender=Post)
+def bump_post_cache_version(sender, instance, raw, **kwargs):
+    if instance.pk and not raw and not instance._state.adding:
+        instance.cache_version = F('cache_version') + 1
+
+
+@receiver(post_save, sender=Category)
+def cascade_category_change(sender, instance, raw, created, **kwargs):
+    if not raw and not created:
+        cascade.cascade('category', [instance.pk])
+
+
+@receiver(post_save, sender=Location)
+def cascade_location_change(sender, instance, raw, created, **kwargs):
+    if not raw and not created:
+        cascade.cascade('location', [instance.pk])
+
+
+@receiver(pre_delete, sender=Category)
+def bump_category_posts_cache_version(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).bump_cache_version()
+
+
+@receiver(pre_delete, sender=Location)
+def bump_location_posts_cache_version(sender, instance, **kwargs):
+    Post.objects.filter(location=instance).bump_cache_version()
+
+
+@receiver(post_save, sender=User)
+def bump_author_posts_cache_version(sender, instance, raw, created,
+                                    update_fields, **kwargs):
+    if raw or created or update_fields == frozenset({'last_login'}):
+        return
+    Post.objects.filter(author=instance).bump_cache_version()
+    invalidate_on_commit({GLOBAL_SCOPE})
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_scopes(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._cache_scopes = get_post_scopes([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = instance.__dict__.pop('_cache_scopes', set())
+    scopes |= get_post_scopes([instance.pk])
+    invalidate_on_commit(scopes)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_on_commit(get_post_scopes([instance.post_id]))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_on_commit({GLOBAL_SCOPE})
+
+
+@receiver(post_save, sender=Post)
+def sync_post_feed_entry(sender, instance, raw, **kwargs):
+    if settings.PUBLISHED_FEED_TABLE and not raw:
+        feed.sync_post(instance)
+
+
+@receiver(posts_published)
+def promote_published_feed_entries(sender, now, post_ids, **kwargs):
+    if settings.PUBLISHED_FEED_TABLE:
+        feed.promote_due_posts(now, post_ids)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_post_image_processing(sender, instance, raw, **kwargs):
+    if not raw and images.needs_processing(instance):
+        jobs.enqueue(images.PROCESS_IMAGE_JOB, post_id=instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image_variants(sender, instance, **kwargs):
+    images.delete_variants(instance.image_variants)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_image(sender, instance, **kwargs):
+    instance._stored_image = media.stored_image_name(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_post_image_refcount(sender, instance, raw, **kwargs):
+    old_name = instance.__dict__.get('_stored_image')
+    if raw or old_name is None:
+        return
+    new_name = instance.image.name or ''
+    if new_name != old_name:
+        media.acquire(new_name)
+        media.release(old_name)
+        instance._stored_image = new_name
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    old_name = instance.__dict__.get('_stored_image')
+    if old_name:
+        media.release(old_name)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, update_fields, **kwargs):
+    # Индексируется и при loaddata: нужны только поля самой публикации.
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
@@ -0,0 +1,29 @@
+from django import template
+from django.core.files.storage import default_storage
+
+from blog.images import get_srcset
+
+register = template.Library()
+
+# Ширина карточки публикации — 40rem, на узких экранах вся ширина.
+SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post):
+    # Пока копии нового фото не готовы, показываем оригинал.
+    items = post.image_variants['items'] if post.image_ready else ()
+    fallback = max(
+        (item for item in items if item['format'] == 'jpeg'),
+        key=lambda item: item['width'],
+        default=None,
+    )
+    return {
+        'post': post,
+        'src': (default_storage.url(fallback['name'])
+                if fallback else post.image.url),
+        'fallback': fallback,
+        'webp_srcset': get_srcset(items, 'webp'),
+        'jpeg_srcset': get_srcset(items, 'jpeg'),
+        'sizes': SIZES,
+    }
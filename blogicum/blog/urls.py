@@ -10,6 +10,11 @@ urlpatterns = [
         views.PostListView.as_view(),
         name='index'
     ),
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -35,6 +40,11 @@ urlpatterns = [
         views.AddCommentView.as_view(),
         name='add_comment'
     ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments',
+    ),
     path(
         'posts/<int:pk>/edit_comment/<int:comment_pk>/',
         views.EditCommentView.as_view(),
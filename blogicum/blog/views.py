@@ -2,11 +2,12 @@ from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
-from django.http import Http404
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -16,8 +17,17 @@ from django.views.generic import (
     UpdateView,
 )
 
+from blog import search
+from blog.cache import category_scope, profile_scope
 from blog.forms import CommentForm, PostForm
+from blog.mixins import (
+    AnonymousPageCacheMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    SlugObjectMixin,
+)
 from blog.models import Category, Comment, Post, User
+from blog.paginators import CursorPaginator, FeedPaginator
 
 
 class RegistrationView(CreateView):
@@ -94,20 +104,29 @@ class AddCommentView(LoginRequiredMixin, CreateView):
         return redirect('blog:post_detail', pk=self.kwargs.get('pk'))
 
 
-class UserProfileView(ListView):
+class UserProfileView(AnonymousPageCacheMixin,
+                      CachedCountMixin,
+                      CursorPaginationMixin,
+                      SlugObjectMixin,
+                      ListView):
     model = Post
     template_name = 'blog/profile.html'
     context_object_name = 'posts'
     paginate_by = settings.PAGINATE_BY
+    paginator_class = FeedPaginator
+    slug_object_model = User
+    slug_field = 'username'
+    slug_url_kwarg = 'username'
+
+    def get_cache_scopes(self):
+        return (profile_scope(self.kwargs.get('username')),)
 
     def get_queryset(self):
-        user = get_object_or_404(User, username=self.kwargs.get('username'))
-        return user.posts.all().annotate(
-            comment_count=Count('comments')).order_by('-pub_date')
+        return self.get_slug_object().posts.feed()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = get_object_or_404(User, username=self.kwargs.get('username'))
+        user = self.get_slug_object()
         context['profile'] = user
         context['username'] = user.username
         if self.request.user.is_authenticated and self.request.user == user:
@@ -118,14 +137,19 @@ class UserProfileView(ListView):
 
 class UserProfileUpdateView(LoginRequiredMixin,
                             UserPassesTestMixin,
+                            SlugObjectMixin,
                             UpdateView):
     model = User
     template_name = 'blog/user.html'
     fields = ('first_name', 'last_name', 'username', 'email')
     slug_url_kwarg = 'username'
     slug_field = 'username'
+    slug_object_model = User
     context_object_name = 'user'
 
+    def get_object(self, queryset=None):
+        return self.get_slug_object()
+
     def test_func(self):
         return self.request.user == self.get_object()
 
@@ -193,59 +217,121 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         return context
 
 
-class PostListView(ListView):
+class PostListView(AnonymousPageCacheMixin,
+                   CachedCountMixin,
+                   CursorPaginationMixin,
+                   ListView):
     model = Post
     template_name = 'blog/index.html'
     context_object_name = 'post_list'
     paginate_by = settings.PAGINATE_BY
+    paginator_class = FeedPaginator
 
     def get_queryset(self):
-        queryset = Post.published_objects.all().annotate(
-            comment_count=Count('comments')).order_by('-pub_date')
+        queryset = Post.published_objects.feed()
         return queryset
 
 
+class PostSearchView(ListView):
+    template_name = 'blog/search.html'
+    context_object_name = 'post_list'
+    paginate_by = settings.PAGINATE_BY
+    paginator_class = FeedPaginator
+    max_query_length = 200
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()[:self.max_query_length]
+
+    def get_queryset(self):
+        return search.search(self.get_search_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        context['page_url_prefix'] = urlencode({'q': query}) + '&'
+        return context
+
+
+def get_comments_page(post, cursor=None):
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        ordering=('created_at', 'id'),
+    )
+    return paginator.page(cursor)
+
+
 class PostDetailView(DetailView):
     model = Post
     template_name = 'blog/detail.html'
 
+    def get_queryset(self):
+        return Post.objects.with_related().visible_to(self.request.user)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
-        )
+        context['comments'] = get_comments_page(self.object)
         return context
 
-    def get(self, request, *args, **kwargs):
-        self.object = self.get_object()
 
-        if request.user == self.object.author:
-            return super().get(request, *args, **kwargs)
-
-        if (not self.object.is_published
-           or not self.object.category.is_published):
-            raise Http404()
-
-        return super().get(request, *args, **kwargs)
+class PostCommentsView(DetailView):
+    model = Post
+    template_name = 'includes/comment_list.html'
 
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user)
 
-class CategoryPostsView(ListView):
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        try:
+            comments = get_comments_page(
+                self.object, request.GET.get('cursor'))
+        except InvalidPage as e:
+            raise Http404(str(e))
+
+        if (request.GET.get('format') == 'json'
+                or 'application/json' in request.headers.get('Accept', '')):
+            return JsonResponse({
+                'comments': [
+                    {
+                        'id': comment.id,
+                        'author': comment.author.username,
+                        'text': comment.text,
+                        'created_at': comment.created_at,
+                    }
+                    for comment in comments
+                ],
+                'next_cursor': comments.next_cursor,
+            })
+        return self.render_to_response(
+            self.get_context_data(comments=comments))
+
+
+class CategoryPostsView(AnonymousPageCacheMixin,
+                        CachedCountMixin,
+                        CursorPaginationMixin,
+                        SlugObjectMixin,
+                        ListView):
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
     paginate_by = settings.PAGINATE_BY
+    paginator_class = FeedPaginator
+    slug_object_model = Category
+    slug_url_kwarg = 'category_slug'
+
+    def get_cache_scopes(self):
+        return (category_scope(self.kwargs.get('category_slug')),)
+
+    def get_slug_object_queryset(self):
+        return Category.objects.filter(is_published=True)
 
     def get_queryset(self):
-        category_slug = self.kwargs.get('category_slug')
-        category = get_object_or_404(Category,
-                                     slug=category_slug,
-                                     is_published=True)
-        return Post.published_objects.filter(category=category)
+        return Post.published_objects.feed(
+            category=self.get_slug_object())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        category_slug = self.kwargs.get('category_slug')
-        context['category'] = get_object_or_404(Category,
-                                                slug=category_slug,
-                                                is_published=True)
+        context['category'] = self.get_slug_object()
         return context
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +71,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.fragment_cache',
             ],
         },
     },
@@ -89,6 +91,16 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -147,3 +159,80 @@ LOGIN_URL = 'login'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 PAGINATE_BY = 10
+
+COMMENTS_PER_PAGE = 50
+
+CURSOR_PAGINATION = False
+
+# Кэш страниц для анонимных читателей; 0 — выключен. Версии кэша
+# сбрасываются в хранилище CACHES, поэтому при нескольких процессах сайта
+# нужен общий кэш (Redis, Memcached, DatabaseCache): с LocMemCache другие
+# процессы до PAGE_CACHE_TIMEOUT отдают устаревшие страницы, в том числе
+# снятые с публикации. То же относится к COUNT_CACHE_TIMEOUT.
+PAGE_CACHE_TIMEOUT = 0
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+COUNT_ESTIMATE_THRESHOLD = None
+
+# Перед включением заполните таблицу: manage.py sync_published_feed --rebuild
+PUBLISHED_FEED_TABLE = False
+
+# Видимость отложенных публикаций переключает manage.py publish_scheduled_posts
+SCHEDULED_PUBLICATION = False
+
+# Ширины уменьшенных копий фото публикаций (WebP и JPEG) для srcset
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+POST_IMAGE_QUALITY = 80
+
+# Фоновые задачи blog.jobs: 'worker' — отдельный процесс manage.py run_jobs,
+# 'thread' — пул потоков в процессе сайта (с SQLite возможны блокировки),
+# 'sync' — сразу при постановке в очередь
+JOB_QUEUE_MODE = 'worker'
+
+JOB_QUEUE_WORKERS = 2
+
+# Сколько публикаций за транзакцию обновляет каскад после изменения
+# категории или местоположения; первая пачка — сразу, остальные — задачей
+CASCADE_BATCH_SIZE = 1000
+
+# Поиск по публикациям: None — средствами СУБД (FTS5 в SQLite, tsvector
+# в PostgreSQL), 'blog.search_index.InvertedIndexBackend' — собственный
+# индекс в SEARCH_INDEX_PATH; заполняется manage.py rebuild_search_index
+SEARCH_BACKEND = None
+
+SEARCH_INDEX_PATH = BASE_DIR / 'search_index' / 'posts.idx'
+
+# Конфигурация полнотекстового поиска PostgreSQL
+SEARCH_CONFIG = 'russian'
+
+# Заголовок Server-Timing и строка в логе core.middleware для каждого запроса
+REQUEST_TIMING = False
+
+# Бюджет SQL-запросов по имени маршрута; '*' — для остальных маршрутов
+REQUEST_QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:category_posts': 5,
+    'blog:profile': 5,
+    'blog:post_detail': 4,
+    '*': 10,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
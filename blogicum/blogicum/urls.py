@@ -4,6 +4,7 @@ from django.conf.urls.static import static
 from django.urls import include, path
 
 from blog import views
+from core.views import serve_media
 
 urlpatterns = [
     path(
@@ -33,4 +34,4 @@ handler404 = 'pages.views.handler404'
 handler403 = 'pages.views.handler403'
 handler500 = 'pages.views.handler500'
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += static(settings.MEDIA_URL, view=serve_media)
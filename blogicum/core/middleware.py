@@ -0,0 +1,97 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+
+
+class RequestTimingMiddleware:
+    """Считает SQL-запросы и время ответа, включается REQUEST_TIMING.
+
+    Результат уходит в заголовок Server-Timing и в строку JSON в логе;
+    запросы сверх бюджета из REQUEST_QUERY_BUDGETS логируются как
+    предупреждения. Время шаблона включает SQL ленивых QuerySet,
+    выполненных при рендеринге.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        metrics.total_time = time.perf_counter() - start
+
+        view_name = (request.resolver_match.view_name
+                     if request.resolver_match else None)
+        budget = self.get_query_budget(view_name)
+        over_budget = budget is not None and metrics.queries > budget
+
+        response['Server-Timing'] = self.server_timing(metrics)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'total_ms': round(metrics.total_time * 1000, 2),
+            'query_budget': budget,
+            'over_budget': over_budget,
+        }
+        logger.log(logging.WARNING if over_budget else logging.INFO,
+                   json.dumps(record, ensure_ascii=False))
+        return response
+
+    def process_template_response(self, request, response):
+        # Промежуточный слой стоит первым, поэтому этот метод вызывается
+        # последним, непосредственно перед рендерингом ответа.
+        metrics = request.request_metrics
+        start = time.perf_counter()
+
+        def finish(response):
+            metrics.template_time += time.perf_counter() - start
+
+        response.add_post_render_callback(finish)
+        return response
+
+    def get_query_budget(self, view_name):
+        budgets = settings.REQUEST_QUERY_BUDGETS
+        return budgets.get(view_name, budgets.get('*'))
+
+    def server_timing(self, metrics):
+        return ', '.join((
+            f'db;desc="SQL: {metrics.queries}";'
+            f'dur={metrics.sql_time * 1000:.2f}',
+            f'tpl;dur={metrics.template_time * 1000:.2f}',
+            f'total;dur={metrics.total_time * 1000:.2f}',
+        ))
@@ -0,0 +1,49 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CHUNK_SIZE = 64 * 1024
+
+DIGEST_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+def is_content_addressed(name):
+    return bool(DIGEST_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файл под SHA-256 его содержимого, одинаковые — один раз.
+
+    Файл по такому имени никогда не меняется, поэтому его можно
+    кэшировать навсегда. Удалять файл можно только когда на него
+    не осталось ссылок: за этим следит blog.media.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Исходное имя всё равно заменяется хэшем в _save. Если файл
+        # с тем же хэшем одновременно записал другой запрос,
+        # FileSystemStorage._save не должен подбирать новое имя.
+        if is_content_addressed(name) and self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        name = posixpath.join(
+            posixpath.dirname(name), hexdigest[:2], hexdigest[2:4],
+            hexdigest + extension)
+        if self.exists(name):
+            return name
+        try:
+            return super()._save(name, content)
+        except FileExistsError:
+            return name
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.views.static import serve
+
+from core.storage import is_content_addressed
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def serve_media(request, path):
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if is_content_addressed(path):
+        # Содержимое файла однозначно задано его именем.
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
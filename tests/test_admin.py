@@ -0,0 +1,105 @@
+import pytest
+
+# Сессия, пользователь, категории для фильтра и для действия переноса,
+# COUNT(*) и страница.
+MAX_CHANGELIST_QUERIES = 6
+# Не зависит от числа выбранных записей: их здесь заметно больше.
+MAX_BULK_ACTION_QUERIES = 25
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ('/admin/blog/post/', '/admin/blog/comment/'))
+def test_admin_changelist_queries(
+        admin_client, mixer, django_assert_max_num_queries, url,
+        many_posts_with_published_locations
+):
+    mixer.cycle(20).blend(
+        'blog.Comment', post=many_posts_with_published_locations[0])
+
+    with django_assert_max_num_queries(MAX_CHANGELIST_QUERIES):
+        response = admin_client.get(url)
+    assert response.status_code == 200
+    assert response.context['cl'].result_count > 0
+    filters = [
+        spec.title.lower() for spec in response.context['cl'].filter_specs
+    ]
+    assert not {'автор публикации', 'текст комментария'} & set(filters), (
+        'Убедитесь, что в админке нет фильтров, строящих список '
+        'значений по всей таблице.'
+    )
+
+
+def post_action(client, url, action, objects, **data):
+    return client.post(url, {
+        'action': action,
+        '_selected_action': [obj.pk for obj in objects],
+        **data,
+    })
+
+
+@pytest.mark.django_db
+def test_admin_bulk_post_actions(
+        admin_client, mixer, django_assert_max_num_queries,
+        many_posts_with_published_locations, another_category
+):
+    posts = many_posts_with_published_locations
+    post_model = type(posts[0])
+    mixer.cycle(3).blend('blog.Comment', post=posts[0])
+
+    with django_assert_max_num_queries(MAX_BULK_ACTION_QUERIES):
+        post_action(admin_client, '/admin/blog/post/', 'unpublish', posts)
+    assert not post_model.objects.filter(is_published=True).exists(), (
+        'Убедитесь, что действие админки снимает с публикации все '
+        'выбранные публикации.'
+    )
+
+    post_action(admin_client, '/admin/blog/post/', 'change_category',
+                posts[:2], category=another_category.pk)
+    assert post_model.objects.filter(
+        category=another_category).count() == 2, (
+        'Убедитесь, что действие админки переносит выбранные публикации '
+        'в указанную категорию.'
+    )
+
+    with django_assert_max_num_queries(MAX_BULK_ACTION_QUERIES):
+        post_action(admin_client, '/admin/blog/post/', 'delete_selected',
+                    posts, post='yes')
+    assert not post_model.objects.exists()
+    assert not posts[0].comments.model.objects.exists(), (
+        'Убедитесь, что при массовом удалении публикаций удаляются '
+        'и их комментарии.'
+    )
+
+
+@pytest.mark.django_db
+def test_admin_bulk_comment_delete(
+        admin_client, mixer, django_assert_max_num_queries,
+        post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(20).blend('blog.Comment', post=post)
+
+    with django_assert_max_num_queries(MAX_BULK_ACTION_QUERIES):
+        post_action(admin_client, '/admin/blog/comment/', 'delete_selected',
+                    comments[:15], post='yes')
+    post.refresh_from_db()
+    assert post.comment_count == 5, (
+        'Убедитесь, что массовое удаление комментариев обновляет счётчик '
+        '`comment_count` публикаций.'
+    )
+
+
+@pytest.mark.django_db
+def test_admin_bulk_category_unpublish(
+        admin_client, client, many_posts_with_published_locations,
+        published_category
+):
+    post_action(admin_client, '/admin/blog/category/', 'unpublish',
+                [published_category])
+    published_category.refresh_from_db()
+    assert not published_category.is_published
+    response = client.get('/')
+    assert not response.context['page_obj'].object_list, (
+        'Убедитесь, что публикации категории, снятой с публикации '
+        'действием админки, пропадают с главной страницы.'
+    )
@@ -0,0 +1,74 @@
+import io
+import json
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.bulkload import iter_json_objects
+
+CREATED_AT = '2022-12-18T23:06:18.993Z'
+
+
+def _fixture_objects():
+    # Публикации идут раньше своего автора, как в blogicum/db.json.
+    return [
+        {'model': 'blog.category', 'pk': 1, 'fields': {
+            'title': 'Категория', 'description': 'Описание',
+            'slug': 'bulk', 'is_published': True,
+            'created_at': CREATED_AT}},
+        *(
+            {'model': 'blog.post', 'pk': pk, 'fields': {
+                'title': f'Публикация {pk}', 'text': 'Текст',
+                'pub_date': CREATED_AT, 'author': 1, 'category': 1,
+                'is_published': True, 'created_at': CREATED_AT}}
+            for pk in range(1, 6)
+        ),
+        {'model': 'auth.user', 'pk': 1, 'fields': {
+            'username': 'bulk_author', 'password': '!',
+            'date_joined': CREATED_AT}},
+        *(
+            {'model': 'blog.comment', 'pk': pk, 'fields': {
+                'text': 'Комментарий', 'post': 1, 'author': 1,
+                'created_at': CREATED_AT}}
+            for pk in range(1, 4)
+        ),
+    ]
+
+
+def test_iter_json_objects_streams_array_and_lines():
+    objects = _fixture_objects()
+    array = json.dumps(objects, ensure_ascii=False, indent=2)
+    lines = '\n'.join(json.dumps(obj) for obj in objects)
+    for text in (array, lines):
+        assert list(iter_json_objects(io.StringIO(text), chunk_size=7)) == (
+            objects), (
+            'Убедитесь, что потоковый разбор фикстуры возвращает все объекты '
+            'при чтении файла маленькими фрагментами.'
+        )
+
+
+@pytest.mark.django_db
+def test_bulk_loaddata(tmp_path, PostModel, CommentModel):
+    path = tmp_path / 'fixture.json'
+    path.write_text(json.dumps(_fixture_objects()), encoding='utf-8')
+
+    call_command('bulk_loaddata', str(path), '--batch-size', '3',
+                 stdout=StringIO())
+
+    assert PostModel.objects.count() == 5
+    assert CommentModel.objects.count() == 3
+    post = PostModel.objects.get(pk=1)
+    assert post.created_at == datetime(
+        2022, 12, 18, 23, 6, 18, 993000, tzinfo=timezone.utc), (
+        'Убедитесь, что команда `bulk_loaddata` сохраняет дату создания '
+        'из фикстуры.'
+    )
+    assert post.comment_count == 3, (
+        'Убедитесь, что после загрузки пересчитываются счётчики '
+        'комментариев.'
+    )
+    assert PostModel.published_objects.count() == 5, (
+        'Убедитесь, что загруженные опубликованные записи видны в ленте.'
+    )
@@ -0,0 +1,76 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from conftest import N_PER_FIXTURE
+
+
+@pytest.mark.django_db
+def test_comment_count_is_maintained(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(N_PER_FIXTURE).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == N_PER_FIXTURE, (
+        'Убедитесь, что при добавлении комментария увеличивается счётчик '
+        '`comment_count` публикации.'
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == N_PER_FIXTURE - 1, (
+        'Убедитесь, что при удалении комментария уменьшается счётчик '
+        '`comment_count` публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(N_PER_FIXTURE).blend('blog.Comment', post=post)
+    type(post).objects.update(comment_count=0)
+
+    call_command('recount_comments', stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == N_PER_FIXTURE, (
+        'Убедитесь, что команда `recount_comments` пересчитывает счётчик '
+        'комментариев.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_save_keeps_comment_count(mixer, post_with_published_location):
+    post = post_with_published_location
+    stale_post = type(post).objects.get(pk=post.pk)
+    mixer.cycle(N_PER_FIXTURE).blend('blog.Comment', post=post)
+
+    stale_post.title = 'Новый заголовок'
+    stale_post.save()
+
+    post.refresh_from_db()
+    assert post.title == 'Новый заголовок'
+    assert post.comment_count == N_PER_FIXTURE, (
+        'Убедитесь, что сохранение публикации из формы или админки '
+        'не перезаписывает счётчик комментариев устаревшим значением.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_save_keeps_cache_version_bumps(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    stale_post = type(post).objects.get(pk=post.pk)
+    version = stale_post.cache_version
+    mixer.blend('blog.Comment', post=post)
+
+    stale_post.title = 'Новый заголовок'
+    stale_post.save()
+
+    post.refresh_from_db()
+    assert post.cache_version == version + 2, (
+        'Убедитесь, что сохранение публикации увеличивает `cache_version` '
+        'в базе и не затирает увеличение от нового комментария.'
+    )
+    assert stale_post.cache_version == post.cache_version
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+
+@pytest.mark.django_db
+@override_settings(COMMENTS_PER_PAGE=2)
+def test_comment_pagination(client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(5).blend('blog.Comment', post=post)
+    expected_ids = [
+        comment.id for comment in
+        sorted(comments, key=lambda c: (c.created_at, c.id))
+    ]
+
+    response = client.get(f'/posts/{post.id}/')
+    page = response.context['comments']
+    assert [comment.id for comment in page] == expected_ids[:2], (
+        'Убедитесь, что на странице публикации выводится только первая '
+        'страница комментариев.'
+    )
+
+    response = client.get(
+        f'/posts/{post.id}/comments/', {'cursor': page.next_cursor})
+    assert response.status_code == HTTPStatus.OK
+    page = response.context['comments']
+    assert [comment.id for comment in page] == expected_ids[2:4], (
+        'Убедитесь, что адрес подгрузки комментариев возвращает '
+        'следующую страницу комментариев.'
+    )
+
+    response = client.get(
+        f'/posts/{post.id}/comments/',
+        {'cursor': page.next_cursor, 'format': 'json'},
+    )
+    data = response.json()
+    assert [c['id'] for c in data['comments']] == expected_ids[4:], (
+        'Убедитесь, что подгрузка комментариев поддерживает формат JSON.'
+    )
+    assert data['next_cursor'] is None
+
+
+@pytest.mark.django_db
+def test_comments_of_hidden_post_are_not_loaded(
+        client, mixer, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    response = client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что комментарии к снятой с публикации записи '
+        'недоступны другим пользователям.'
+    )
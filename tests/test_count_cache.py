@@ -0,0 +1,42 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+
+
+def _get_count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    count_queries = [
+        query for query in queries.captured_queries
+        if 'COUNT(' in query['sql'].upper()
+    ]
+    return response, count_queries
+
+
+@pytest.mark.django_db
+def test_feed_count_is_cached(
+        user_client, mixer, many_posts_with_published_locations
+):
+    post = many_posts_with_published_locations[0]
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    ):
+        _get_count_queries(user_client, url)
+        response, count_queries = _get_count_queries(user_client, url)
+        assert not count_queries, (
+            f'Убедитесь, что количество публикаций для пагинации на '
+            f'странице `{url}` берётся из кэша.'
+        )
+
+        total = response.context['page_obj'].paginator.count
+        mixer.blend(
+            'blog.Post', author=post.author, category=post.category,
+            is_published=True, pub_date=timezone.now())
+        response, _ = _get_count_queries(user_client, url)
+        assert response.context['page_obj'].paginator.count == total + 1, (
+            f'Убедитесь, что кэш количества публикаций на странице `{url}` '
+            'сбрасывается при добавлении публикации.'
+        )
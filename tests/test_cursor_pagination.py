@@ -0,0 +1,82 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+
+def _walk_pages(client, url, direction_cursor):
+    pages = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['page_obj']
+        pages.append([post.id for post in page])
+        cursor = direction_cursor(page)
+        if not cursor:
+            return pages, page
+        response = client.get(url, {'cursor': cursor})
+
+
+@pytest.mark.django_db
+@override_settings(CURSOR_PAGINATION=True)
+def test_cursor_pagination(client, many_posts_with_published_locations):
+    posts = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+    expected_ids = [post.id for post in posts]
+    category_slug = posts[0].category.slug
+    profile_username = posts[0].author.username
+
+    for url in (
+        '/',
+        f'/category/{category_slug}/',
+        f'/profile/{profile_username}/',
+    ):
+        pages, last_page = _walk_pages(
+            client, url, lambda page: page.next_cursor)
+        assert all(len(page) <= N_PER_PAGE for page in pages), (
+            f'Убедитесь, что при курсорной пагинации на странице `{url}` '
+            f'выводится не больше {N_PER_PAGE} публикаций.'
+        )
+        assert sum(pages, []) == expected_ids, (
+            f'Убедитесь, что курсорная пагинация на странице `{url}` '
+            'обходит все публикации «от новых к старым» без пропусков '
+            'и повторов.'
+        )
+
+        response = client.get(url, {'cursor': last_page.previous_cursor})
+        assert [post.id for post in response.context['page_obj']] == (
+            pages[-2]
+        ), (
+            f'Убедитесь, что ссылка на предыдущую страницу на `{url}` '
+            'возвращает предыдущую страницу ленты.'
+        )
+
+
+@pytest.mark.django_db
+@override_settings(CURSOR_PAGINATION=True)
+def test_cursor_pagination_invalid_cursor(
+        client, post_with_published_location
+):
+    tokens = ['not-a-cursor'] + [
+        base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        for payload in (
+            ['n', [None, None]],
+            ['n', ['2024-01-01T00:00:00', 10 ** 30]],
+            ['p', ['2024-01-01T00:00:00', None]],
+        )
+    ]
+    for url in ('/', f'/posts/{post_with_published_location.id}/comments/'):
+        for token in tokens:
+            response = client.get(url, {'cursor': token})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Убедитесь, что для некорректного курсора, в том числе '
+                'с пустыми значениями или числами вне диапазона, '
+                f'страница `{url}` возвращает статус 404.'
+            )
@@ -0,0 +1,21 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('feed_settings', (
+    {},
+    {'SCHEDULED_PUBLICATION': True},
+    {'PUBLISHED_FEED_TABLE': True},
+))
+def test_check_feed_indexes(
+        feed_settings, many_posts_with_published_locations, mixer
+):
+    mixer.blend('blog.Comment', post=many_posts_with_published_locations[0])
+    with override_settings(**feed_settings):
+        call_command('sync_published_feed', '--rebuild', stdout=StringIO())
+        # CommandError, если какой-то запрос ленты обходит индексы.
+        call_command('check_feed_indexes', stdout=StringIO())
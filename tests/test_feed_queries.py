@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog import views
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(queries)
+
+
+@pytest.mark.django_db
+@override_settings(PAGE_CACHE_TIMEOUT=0, COUNT_CACHE_TIMEOUT=0)
+@pytest.mark.parametrize('view_class, url_template', (
+    (views.PostListView, '/'),
+    (views.CategoryPostsView, '/category/{post.category.slug}/'),
+    (views.UserProfileView, '/profile/{post.author.username}/'),
+))
+def test_feed_query_count_does_not_depend_on_page_size(
+        client, monkeypatch, many_posts_with_published_locations,
+        view_class, url_template
+):
+    url = url_template.format(post=many_posts_with_published_locations[0])
+
+    monkeypatch.setattr(view_class, 'paginate_by', 2)
+    small_page_queries = _count_queries(client, url)
+    monkeypatch.setattr(view_class, 'paginate_by', 20)
+    large_page_queries = _count_queries(client, url)
+
+    assert small_page_queries == large_page_queries, (
+        f'Убедитесь, что число SQL-запросов при загрузке страницы `{url}` '
+        'не зависит от количества публикаций на странице: автор, категория '
+        'и местоположение должны загружаться вместе с публикациями.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(PAGE_CACHE_TIMEOUT=0, COUNT_CACHE_TIMEOUT=0)
+def test_slug_object_is_loaded_once(
+        client, user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    for test_client, url, expected_queries in (
+        # Категория, COUNT(*) и страница публикаций.
+        (client, f'/category/{post.category.slug}/', 3),
+        # Пользователь, COUNT(*) и страница публикаций.
+        (client, f'/profile/{post.author.username}/', 3),
+        # Сессия, текущий пользователь и редактируемый профиль.
+        (user_client, f'/profile/{user.username}/edit/', 3),
+    ):
+        n_queries = _count_queries(test_client, url)
+        assert n_queries == expected_queries, (
+            f'Убедитесь, что объект из адреса страницы `{url}` загружается '
+            'из базы данных один раз за запрос.'
+        )
+
+
+@pytest.mark.django_db
+def test_post_detail_query_count(
+        client, user_client, another_user_client, mixer,
+        post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    url = f'/posts/{post.id}/'
+    for test_client, expected_queries in (
+        # Публикация со связанными объектами и страница комментариев.
+        (client, 2),
+        # Плюс сессия и текущий пользователь.
+        (user_client, 4),
+        (another_user_client, 4),
+    ):
+        n_queries = _count_queries(test_client, url)
+        assert n_queries == expected_queries, (
+            f'Убедитесь, что страница публикации `{url}` загружает '
+            'публикацию вместе с автором, категорией и местоположением '
+            'одним запросом, проверяя её видимость в SQL.'
+        )
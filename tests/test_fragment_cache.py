@@ -0,0 +1,37 @@
+import pytest
+
+
+def _assert_pages_contain(user_client, urls, expected, err_msg):
+    for url in urls:
+        content = user_client.get(url).content.decode('utf-8')
+        assert expected in content, err_msg.format(url=url)
+
+
+@pytest.mark.django_db
+def test_post_fragment_cache_invalidation(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    urls = ('/', f'/posts/{post.id}/')
+    for url in urls:
+        user_client.get(url)
+
+    for related, attr, value, expected in (
+        (post.category, 'title', 'Новая категория', 'Новая категория'),
+        (post.location, 'name', 'Новое место', 'Новое место'),
+        (post.author, 'username', 'renamed_author', '@renamed_author'),
+    ):
+        setattr(related, attr, value)
+        related.save()
+        _assert_pages_contain(
+            user_client, urls, expected,
+            'Убедитесь, что кэш фрагментов страницы `{url}` сбрасывается '
+            'при изменении автора, категории и местоположения публикации.'
+        )
+
+    mixer.blend('blog.Comment', post=post)
+    _assert_pages_contain(
+        user_client, ('/',), 'Комментарии (1)',
+        'Убедитесь, что кэш карточки публикации на странице `{url}` '
+        'сбрасывается при добавлении комментария.'
+    )
@@ -0,0 +1,91 @@
+import io
+from io import StringIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog import jobs
+from blog.models import Job
+
+
+def _image_file(width=1600, height=800):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, format='PNG')
+    return SimpleUploadedFile(
+        'variants.png', buffer.getvalue(), content_type='image/png')
+
+
+@pytest.fixture
+def post_with_image(settings, tmp_path, post_with_published_location):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WIDTHS = (320, 640, 1280, 2000)
+    post = post_with_published_location
+    post.image = _image_file()
+    post.save()
+    assert not post.image_ready, (
+        'Убедитесь, что копии фото создаются в фоне, а не при сохранении '
+        'публикации.'
+    )
+
+    call_command('run_jobs', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image_ready, (
+        'Убедитесь, что фоновая задача создаёт копии фото.'
+    )
+    return post
+
+
+@pytest.mark.django_db
+def test_image_variants_generated(client, post_with_image):
+    items = post_with_image.image_variants['items']
+    assert sorted((item['format'], item['width']) for item in items) == [
+        ('jpeg', 320), ('jpeg', 640), ('jpeg', 1280), ('jpeg', 1600),
+        ('webp', 320), ('webp', 640), ('webp', 1280), ('webp', 1600),
+    ], (
+        'Убедитесь, что при загрузке фото создаются уменьшенные копии '
+        'в WebP и JPEG без увеличения исходной картинки.'
+    )
+    for item in items:
+        assert item['height'] == item['width'] // 2
+        assert default_storage.exists(item['name'])
+
+    content = client.get('/').content.decode('utf-8')
+    assert 'type="image/webp"' in content and ' 640w' in content, (
+        'Убедитесь, что в ленте фото выводится с атрибутом srcset.'
+    )
+
+    post_with_image.image = None
+    post_with_image.save()
+    call_command('run_jobs', stdout=StringIO())
+    post_with_image.refresh_from_db()
+    assert post_with_image.image_variants == {}
+    assert not any(default_storage.exists(item['name']) for item in items), (
+        'Убедитесь, что при удалении фото удаляются и его копии.'
+    )
+
+
+@pytest.mark.django_db
+def test_generate_image_variants_command(post_with_image, PostModel):
+    PostModel.objects.filter(pk=post_with_image.pk).update(image_variants={})
+
+    call_command('generate_image_variants', stdout=StringIO())
+
+    post_with_image.refresh_from_db()
+    assert post_with_image.image_variants['items'], (
+        'Убедитесь, что команда `generate_image_variants` создаёт копии '
+        'для уже загруженных фото.'
+    )
+
+
+@pytest.mark.django_db
+def test_failed_job_is_retried():
+    job = jobs.enqueue('missing_handler')
+    jobs.run_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == Job.Status.PENDING and job.attempts == 1, (
+        'Убедитесь, что задача с ошибкой возвращается в очередь.'
+    )
+    assert 'missing_handler' in job.error
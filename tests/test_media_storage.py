@@ -0,0 +1,61 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.models import MediaBlob
+from core.views import serve_media
+
+
+def _upload():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), 'orange').save(buffer, format='PNG')
+    return SimpleUploadedFile(
+        'Same.PNG', buffer.getvalue(), content_type='image/png')
+
+
+@pytest.mark.django_db
+def test_uploads_are_deduplicated(
+        settings, tmp_path, rf, mixer, user, published_category,
+        django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = tmp_path
+    posts = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+        location=None, image=None)
+    for post in posts:
+        post.image = _upload()
+        post.save()
+
+    first, second = posts
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые файлы сохраняются под одним именем.'
+    )
+    assert first.image.name.startswith('posts_images/')
+    assert first.image.name.endswith('.png')
+    stored_files = [path for path in tmp_path.rglob('*') if path.is_file()]
+    assert len(stored_files) == 1, (
+        'Убедитесь, что повторно загруженный файл не сохраняется ещё раз.'
+    )
+    assert MediaBlob.objects.get(name=first.image.name).ref_count == 2
+
+    # В тестах DEBUG выключен и маршрут для медиа не подключается.
+    response = serve_media(rf.get(first.image.url), first.image.name)
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что файлы, хранящиеся по хэшу, отдаются с заголовком '
+        'бессрочного кэширования.'
+    )
+    response.close()
+
+    first.delete()
+    assert MediaBlob.objects.get(name=second.image.name).ref_count == 1
+    assert stored_files[0].exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.image = None
+        second.save()
+    assert not MediaBlob.objects.exists()
+    assert not stored_files[0].exists(), (
+        'Убедитесь, что файл удаляется, когда на него не осталось ссылок.'
+    )
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response.content.decode('utf-8'), len(queries)
+
+
+@pytest.mark.django_db
+def test_anonymous_page_cache(
+        settings, client, user_client, mixer, post_with_published_location
+):
+    # По умолчанию кэш страниц выключен: он требует общего хранилища.
+    settings.PAGE_CACHE_TIMEOUT = 60 * 5
+    post = post_with_published_location
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    ):
+        _get(client, url)
+        content, n_queries = _get(client, url)
+        assert n_queries == 0, (
+            f'Убедитесь, что страница `{url}` для анонимного пользователя '
+            'отдаётся из кэша без обращений к базе данных.'
+        )
+
+        _, n_queries = _get(user_client, url)
+        assert n_queries > 0, (
+            f'Убедитесь, что страница `{url}` не кэшируется для '
+            'авторизованного пользователя.'
+        )
+
+    post.title = 'Обновлённый заголовок публикации'
+    post.save()
+    mixer.blend('blog.Comment', post=post)
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    ):
+        content, _ = _get(client, url)
+        assert post.title in content and '(1)' in content, (
+            f'Убедитесь, что кэш страницы `{url}` сбрасывается при '
+            'изменении публикации и добавлении комментария.'
+        )
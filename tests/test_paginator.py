@@ -0,0 +1,22 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.template.loader import render_to_string
+
+from blog.paginators import FeedPaginator
+
+
+def _count_page_links(n_pages, number):
+    paginator = FeedPaginator(range(n_pages), per_page=1)
+    content = render_to_string(
+        'includes/paginator.html', {'page_obj': paginator.page(number)})
+    return len(BeautifulSoup(content, features='html.parser').select('li'))
+
+
+@pytest.mark.parametrize('number', (1, 50))
+def test_paginator_page_range_is_windowed(number):
+    small = _count_page_links(n_pages=100, number=number)
+    large = _count_page_links(n_pages=100_000, number=number)
+    assert small == large, (
+        'Убедитесь, что число ссылок в пагинаторе не зависит от общего '
+        'количества страниц.'
+    )
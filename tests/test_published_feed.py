@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog import moderation
+
+
+def _published_ids(PostModel):
+    return set(PostModel.published_objects.values_list('id', flat=True))
+
+
+@pytest.mark.django_db
+@override_settings(PUBLISHED_FEED_TABLE=True)
+def test_published_feed_table(
+        client, PostModel, many_posts_with_published_locations,
+        future_posts, posts_with_unpublished_category
+):
+    call_command('sync_published_feed', '--rebuild', stdout=StringIO())
+    published_ids = {post.id for post in many_posts_with_published_locations}
+    assert _published_ids(PostModel) == published_ids, (
+        'Убедитесь, что таблица ленты содержит только опубликованные '
+        'публикации с опубликованной категорией и датой в прошлом.'
+    )
+
+    deferred = future_posts[0]
+    PostModel.objects.filter(pk=deferred.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    call_command('sync_published_feed', stdout=StringIO())
+    assert deferred.id in _published_ids(PostModel), (
+        'Убедитесь, что команда `sync_published_feed` добавляет в ленту '
+        'отложенные публикации, время которых наступило.'
+    )
+
+    category = many_posts_with_published_locations[0].category
+    category.is_published = False
+    category.save()
+    assert _published_ids(PostModel) == {deferred.id}, (
+        'Убедитесь, что при снятии категории с публикации её публикации '
+        'удаляются из таблицы ленты.'
+    )
+
+    category.is_published = True
+    category.save()
+    response = client.get(f'/category/{category.slug}/')
+    assert response.context['page_obj'].paginator.count == len(
+        published_ids), (
+        'Убедитесь, что страница категории читает публикации из таблицы '
+        'ленты.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(PUBLISHED_FEED_TABLE=True)
+def test_published_feed_table_bulk_moderation(
+        PostModel, many_posts_with_published_locations, future_posts
+):
+    call_command('sync_published_feed', '--rebuild', stdout=StringIO())
+    posts = many_posts_with_published_locations
+    moderation.set_posts_published(
+        PostModel.objects.filter(pk__in=[post.pk for post in posts[:3]]),
+        False)
+    moderation.set_posts_published(
+        PostModel.objects.filter(pk__in=[post.pk for post in future_posts]),
+        True)
+    assert _published_ids(PostModel) == {post.id for post in posts[3:]}, (
+        'Убедитесь, что массовое снятие с публикации удаляет публикации '
+        'из таблицы ленты, а публикация с датой в будущем в ленту не '
+        'попадает.'
+    )
+
+    category = posts[0].category
+    moderation.set_categories_published(
+        type(category).objects.filter(pk=category.pk), False)
+    assert not _published_ids(PostModel)
+    moderation.set_categories_published(
+        type(category).objects.filter(pk=category.pk), True)
+    assert _published_ids(PostModel) == {post.id for post in posts[3:]}, (
+        'Убедитесь, что массовая публикация категории возвращает её '
+        'публикации в таблицу ленты.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(PUBLISHED_FEED_TABLE=True)
+def test_promote_due_posts_checks_only_scheduled_posts(
+        PostModel, many_posts_with_published_locations
+):
+    call_command('sync_published_feed', '--rebuild', stdout=StringIO())
+    post = many_posts_with_published_locations[0]
+    post.feed_entry.delete()
+
+    call_command('sync_published_feed', stdout=StringIO())
+    assert post.id not in _published_ids(PostModel), (
+        'Убедитесь, что `sync_published_feed` без `--rebuild` ищет '
+        'кандидатов среди отложенных публикаций, а не обходит всю таблицу.'
+    )
+    call_command('sync_published_feed', '--rebuild', stdout=StringIO())
+    assert post.id in _published_ids(PostModel)
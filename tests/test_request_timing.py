@@ -0,0 +1,38 @@
+import json
+import logging
+
+import pytest
+from django.test import override_settings
+
+
+@pytest.mark.django_db
+def test_request_timing_disabled_by_default(client):
+    response = client.get('/')
+    assert 'Server-Timing' not in response, (
+        'Убедитесь, что замеры запросов по умолчанию выключены.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_TIMING=True, PAGE_CACHE_TIMEOUT=0,
+                   REQUEST_QUERY_BUDGETS={'blog:index': 0})
+def test_request_timing(client, caplog, many_posts_with_published_locations):
+    with caplog.at_level(logging.INFO, logger='core.middleware'):
+        response = client.get('/')
+
+    server_timing = response['Server-Timing']
+    for metric in ('db;', 'tpl;', 'total;'):
+        assert metric in server_timing, (
+            'Убедитесь, что заголовок Server-Timing содержит время SQL, '
+            'рендеринга шаблона и общее время ответа.'
+        )
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['view'] == 'blog:index'
+    assert record['queries'] > 0
+    assert record['template_ms'] > 0
+    assert record['over_budget'] and caplog.records[-1].levelno == (
+        logging.WARNING), (
+        'Убедитесь, что запросы сверх бюджета SQL-запросов логируются '
+        'как предупреждения.'
+    )
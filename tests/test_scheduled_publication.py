@@ -0,0 +1,32 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+@override_settings(SCHEDULED_PUBLICATION=True)
+def test_publish_scheduled_posts(client, PostModel, future_posts):
+    deferred = future_posts[0]
+    assert not PostModel.published_objects.filter(pk=deferred.pk).exists(), (
+        'Убедитесь, что отложенная публикация не видна до наступления '
+        'даты публикации.'
+    )
+    client.get('/')
+
+    PostModel.objects.filter(pk=deferred.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    assert not PostModel.published_objects.filter(pk=deferred.pk).exists()
+
+    call_command('publish_scheduled_posts', stdout=StringIO())
+    assert PostModel.published_objects.filter(pk=deferred.pk).exists(), (
+        'Убедитесь, что команда `publish_scheduled_posts` открывает '
+        'отложенные публикации, дата которых наступила.'
+    )
+    assert deferred.title in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что после открытия отложенной публикации кэш главной '
+        'страницы сбрасывается.'
+    )
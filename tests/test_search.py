@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import search_index
+
+
+@pytest.fixture
+def search_posts(mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        kwargs.setdefault('is_published', True)
+        return mixer.blend(
+            'blog.Post', title=title, text=text, author=user,
+            category=published_category, **kwargs)
+
+    return {
+        'title': blend('Котики на крыше', 'Про погоду.'),
+        'text': blend('Прогулка', 'По дороге встретили котиков.'),
+        'other': blend('Собаки', 'Ничего про кошек.'),
+        'hidden': blend('Котики в черновике', 'Текст.', is_published=False),
+        'future': blend('Котики завтра', 'Текст.',
+                        pub_date=timezone.now() + timedelta(days=1)),
+    }
+
+
+def _found(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return [post.pk for post in response.context['page_obj']]
+
+
+@pytest.mark.django_db
+def test_search(client, search_posts):
+    assert _found(client, 'КОТИК') == [
+        search_posts['title'].pk, search_posts['text'].pk], (
+        'Убедитесь, что поиск находит только опубликованные публикации, '
+        'а совпадения в заголовке стоят выше совпадений в тексте.'
+    )
+    assert _found(client, '') == []
+
+    post = search_posts['other']
+    post.title = 'Котики и собаки'
+    post.save()
+    assert post.pk in _found(client, 'котики'), (
+        'Убедитесь, что поисковый индекс обновляется при сохранении '
+        'публикации.'
+    )
+
+    search_posts['title'].delete()
+    assert search_posts['title'].pk not in _found(client, 'котики'), (
+        'Убедитесь, что удалённые публикации пропадают из поиска.'
+    )
+
+
+@pytest.mark.django_db
+def test_inverted_index_search(settings, tmp_path, client, search_posts,
+                               django_capture_on_commit_callbacks):
+    settings.SEARCH_BACKEND = 'blog.search_index.InvertedIndexBackend'
+    settings.SEARCH_INDEX_PATH = tmp_path / 'posts.idx'
+    call_command('rebuild_search_index', stdout=StringIO())
+
+    assert _found(client, 'котиков') == [
+        search_posts['title'].pk, search_posts['text'].pk], (
+        'Убедитесь, что собственный индекс находит словоформы '
+        'и ранжирует результаты по BM25.'
+    )
+
+    post = search_posts['other']
+    with django_capture_on_commit_callbacks(execute=True):
+        post.text = 'Cats and kittens.'
+        post.save()
+        search_posts['title'].delete()
+    assert _found(client, 'cat') == [post.pk]
+    assert _found(client, 'котики') == [search_posts['text'].pk], (
+        'Убедитесь, что индекс обновляется при сохранении и удалении '
+        'публикаций.'
+    )
+
+
+def test_inverted_index_champions(monkeypatch, tmp_path):
+    monkeypatch.setattr(search_index, 'CHAMPIONS', 2)
+    monkeypatch.setattr(search_index, 'CHAMPION_MIN_DF', 3)
+    index = search_index.InvertedIndex()
+    for doc_id in range(1, 11):
+        index.add(doc_id, {'город': doc_id, 'море': 1})
+    index.remove(10)
+    index.save(tmp_path / 'posts.idx')
+
+    loaded = search_index.InvertedIndex.load(tmp_path / 'posts.idx')
+    loaded.add(11, {'город': 50})
+    assert loaded.search(['город'], 2) == [11, 9], (
+        'Убедитесь, что для частых терминов сохраняются лучшие документы '
+        'и учитываются документы, добавленные после загрузки индекса.'
+    )
+    assert set(loaded.search(['город', 'море'], 10)) == {1, 2, 8, 9}, (
+        'Убедитесь, что запрос из частых слов оценивает только лучшие '
+        'документы каждого слова.'
+    )
+
+
+def test_inverted_index_journal_recovery(settings, tmp_path):
+    settings.SEARCH_INDEX_PATH = tmp_path / 'posts.idx'
+    big_id = 2 ** 40
+    index = search_index.InvertedIndex()
+    index.add(big_id, {'город': 1})
+    index.save(settings.SEARCH_INDEX_PATH)
+    assert search_index.InvertedIndex.load(
+        settings.SEARCH_INDEX_PATH).search(['город'], 10) == [big_id], (
+        'Убедитесь, что индекс хранит 64-битные id публикаций.'
+    )
+
+    backend = search_index.InvertedIndexBackend()
+    backend._append({'id': 1, 'terms': {'море': 1}})
+    with open(backend.journal_path, 'ab') as journal:
+        journal.write(b'{"id": 2, "ter\n')
+    backend._append_many([{'id': 3, 'terms': {'море': 2}}])
+    assert sorted(backend.get_index().search(['море'], 10)) == [1, 3], (
+        'Убедитесь, что повреждённая запись журнала пропускается и не '
+        'ломает поиск.'
+    )
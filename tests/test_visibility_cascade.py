@@ -0,0 +1,88 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.cascade import CASCADE_JOB
+from blog.models import Job
+
+BATCH_SIZE = 3
+
+
+def _cache_versions(posts):
+    model = type(posts[0])
+    return dict(model.objects.filter(
+        pk__in=[post.pk for post in posts]
+    ).values_list('pk', 'cache_version'))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('field', ('category', 'location'))
+def test_visibility_cascade_in_batches(
+        settings, client, field, many_posts_with_published_locations
+):
+    settings.CASCADE_BATCH_SIZE = BATCH_SIZE
+    posts = many_posts_with_published_locations
+    related = getattr(posts[0], field)
+    dependent = [post for post in posts if getattr(post, field) == related]
+    assert len(dependent) > BATCH_SIZE
+    before = _cache_versions(dependent)
+
+    related.is_published = False
+    related.save()
+
+    bumped = [pk for pk, version in _cache_versions(dependent).items()
+              if version > before[pk]]
+    assert len(bumped) == BATCH_SIZE, (
+        'Убедитесь, что при изменении категории или местоположения сразу '
+        'обновляется только первая пачка публикаций, остальные — '
+        'фоновой задачей.'
+    )
+    if field == 'category':
+        assert not client.get('/').context['page_obj'].object_list, (
+            'Убедитесь, что публикации категории, снятой с публикации, '
+            'пропадают из ленты сразу, не дожидаясь фоновой задачи.'
+        )
+
+    call_command('run_jobs', stdout=StringIO())
+
+    assert all(version > before[pk]
+               for pk, version in _cache_versions(dependent).items()), (
+        'Убедитесь, что фоновая задача обновляет `cache_version` всех '
+        'публикаций категории или местоположения.'
+    )
+    job = Job.objects.get(kind=CASCADE_JOB)
+    assert job.status == Job.Status.DONE
+    assert job.progress == job.total == len(dependent), (
+        'Убедитесь, что задача каскада сохраняет ход выполнения.'
+    )
+
+
+@pytest.mark.django_db
+def test_visibility_cascade_updates_feed_table(
+        settings, many_posts_with_published_locations
+):
+    settings.PUBLISHED_FEED_TABLE = True
+    settings.CASCADE_BATCH_SIZE = BATCH_SIZE
+    call_command('sync_published_feed', '--rebuild', stdout=StringIO())
+    posts = many_posts_with_published_locations
+    post_model = type(posts[0])
+    category = posts[0].category
+
+    category.is_published = False
+    category.save()
+    assert post_model.published_objects.count() == len(posts) - BATCH_SIZE, (
+        'Убедитесь, что при включённой таблице ленты видимость категории '
+        'переносится в записи ленты пачками.'
+    )
+
+    call_command('run_jobs', stdout=StringIO())
+    assert not post_model.published_objects.exists(), (
+        'Убедитесь, что фоновая задача скрывает из таблицы ленты все '
+        'публикации категории, снятой с публикации.'
+    )
+
+    category.is_published = True
+    category.save()
+    call_command('run_jobs', stdout=StringIO())
+    assert post_model.published_objects.count() == len(posts)